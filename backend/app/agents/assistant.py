@@ -3,8 +3,11 @@ Main Assistant Agent - A helpful AI assistant with session memory and RAG.
 """
 from agno.agent import Agent
 from agno.db.postgres import PostgresDb
+from app.agents.conversation_messages import record_run_messages
+from app.agents.session_compaction import compact_session_runs
 from app.config.models import get_model
 from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
 
 
 def get_db() -> PostgresDb:
@@ -15,7 +18,7 @@ def get_db() -> PostgresDb:
         PostgresDb: Configured database instance.
     """
     return PostgresDb(
-        db_url=settings.DATABASE_URL_BASE,
+        db_engine=create_instrumented_engine("agent_sessions", settings.DATABASE_URL_BASE),
         db_schema=settings.DB_APP_SCHEMA,
         session_table="agent_sessions",
         create_schema=False,
@@ -96,4 +99,7 @@ def create_assistant_agent(
         search_knowledge=False,  # Disabled - we use custom tool
         instructions=instructions,
         markdown=False,
+        # Copy each completed run's messages to app.conversation_messages,
+        # then archive runs beyond SESSION_LIVE_RUNS before the session is saved
+        post_hooks=[record_run_messages, compact_session_runs],
     )
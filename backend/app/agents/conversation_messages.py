@@ -0,0 +1,80 @@
+"""
+Conversation message log (app.conversation_messages).
+
+A post-hook on the assistant agent copies each completed run's user and
+assistant messages into a plain table, so conversation history is read with
+an index range scan instead of parsing agent_sessions.runs.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import List
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+_engine = None
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_instrumented_engine("conversation_messages", settings.DATABASE_URL, pool_pre_ping=True)
+    return _engine
+
+
+def _message_rows(run_output) -> List[dict]:
+    """User and assistant messages produced by this run (history context excluded)."""
+    rows = []
+    for message in run_output.messages or []:
+        if message.role not in ("user", "assistant") or getattr(message, "from_history", False):
+            continue
+        content = message.content
+        if not content or not message.id:
+            continue
+        rows.append({
+            "run_id": run_output.run_id,
+            "message_id": message.id,
+            "role": message.role,
+            "content": content if isinstance(content, str) else json.dumps(content),
+            "created_at": message.created_at,
+        })
+    return rows
+
+
+def store_run_messages(conversation_id: str, rows: List[dict]) -> None:
+    """Insert messages for a conversation (idempotent; skipped if the conversation does not exist)."""
+    params = [{**row, "conversation_id": conversation_id} for row in rows]
+    with _get_engine().connect() as conn:
+        conn.execute(
+            text(f"""
+                INSERT INTO {settings.DB_APP_SCHEMA}.conversation_messages
+                (conversation_id, run_id, message_id, role, content, created_at)
+                SELECT c.id, :run_id, :message_id, :role, :content,
+                       COALESCE(to_timestamp(CAST(:created_at AS DOUBLE PRECISION))::timestamp, NOW())
+                FROM {settings.DB_APP_SCHEMA}.conversations c
+                WHERE c.id = CAST(:conversation_id AS UUID)
+                ON CONFLICT (conversation_id, message_id) DO NOTHING
+            """),
+            params
+        )
+        conn.commit()
+
+
+async def record_run_messages(run_output) -> None:
+    """Agent post-hook: log the completed run's messages for its conversation."""
+    try:
+        # conversation_id is used as session_id; other sessions are not conversations
+        conversation_id = str(uuid.UUID(run_output.session_id))
+    except (TypeError, ValueError):
+        return
+
+    rows = _message_rows(run_output)
+    if not rows:
+        return
+    try:
+        await asyncio.to_thread(store_run_messages, conversation_id, rows)
+    except Exception as e:
+        print(f"[WARNING] Failed to record messages for conversation {conversation_id}: {e}")
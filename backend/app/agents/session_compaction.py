@@ -0,0 +1,86 @@
+"""
+Session run compaction (app.agent_session_runs_archive).
+
+Agno keeps every run of a session in agent_sessions.runs and rewrites the
+whole value on every turn. A post-hook on the assistant agent moves runs
+beyond the most recent SESSION_LIVE_RUNS to an archive table before Agno
+saves the session, so the live row (and each turn's write) stays bounded.
+History context only needs the last num_history_runs runs.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import List
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+_engine = None
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_instrumented_engine("session_archive", settings.DATABASE_URL, pool_pre_ping=True)
+    return _engine
+
+
+def archive_runs(session_id: str, runs: List[dict]) -> None:
+    """Insert runs into the archive (idempotent on session_id, run_id)."""
+    with _get_engine().connect() as conn:
+        conn.execute(
+            text(f"""
+                INSERT INTO {settings.DB_APP_SCHEMA}.agent_session_runs_archive
+                (session_id, run_id, run, created_at)
+                VALUES (
+                    :session_id, :run_id, CAST(:run AS JSONB),
+                    COALESCE(to_timestamp(CAST(:created_at AS DOUBLE PRECISION))::timestamp, NOW())
+                )
+                ON CONFLICT (session_id, run_id) DO NOTHING
+            """),
+            [
+                {
+                    "session_id": session_id,
+                    "run_id": run["run_id"],
+                    "run": json.dumps(run, default=str),
+                    "created_at": run.get("created_at"),
+                }
+                for run in runs
+            ]
+        )
+        conn.commit()
+
+
+def live_runs_limit(num_history_runs: int) -> int:
+    """Runs kept in the live row: SESSION_LIVE_RUNS, never fewer than the history window."""
+    return max(settings.SESSION_LIVE_RUNS, num_history_runs + 1)
+
+
+async def compact_session_runs(agent, session) -> None:
+    """
+    Agent post-hook: archive old runs and trim session.runs in place.
+
+    Runs only leave the in-memory session after they are committed to the
+    archive, so a failure here leaves the session untouched.
+    """
+    runs = session.runs or []
+    keep = live_runs_limit(agent.num_history_runs or 0)
+    if len(runs) <= keep:
+        return
+
+    archived = []
+    for run in runs[:-keep]:
+        run_dict = run.to_dict()
+        if not run.run_id:
+            # Positions shift after each compaction and identical runs share a
+            # content hash, so ID-less runs get a fresh key (never dropped)
+            run_dict["run_id"] = f"{session.session_id}:{uuid.uuid4()}"
+        archived.append(run_dict)
+    try:
+        await asyncio.to_thread(archive_runs, session.session_id, archived)
+    except Exception as e:
+        print(f"[WARNING] Failed to archive runs for session {session.session_id}: {e}")
+        return
+    session.runs = runs[-keep:]
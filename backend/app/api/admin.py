@@ -2,12 +2,15 @@
 API endpoints for administration.
 """
 
+import asyncio
+import uuid
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from sqlalchemy import create_engine, text
 from typing import Optional
 from app.config.settings import settings
-from app.config.embedders import get_embedder, EMBEDDING_DIMENSIONS, DEFAULT_EMBEDDING_MODELS
+from app.config.embedders import get_embedder, get_current_embedding_config
+from app.utils.readiness import get_readiness
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -20,6 +23,14 @@ class EmbeddingConfigResponse(BaseModel):
     status: str
     needs_reindex: bool
     message: Optional[str] = None
+    stale_documents: int = 0
+    stale_only: bool = False  # Reindexing stale documents is enough (config unchanged)
+
+
+class ReindexRequest(BaseModel):
+    """Request model for reindex operation (all documents by default)."""
+    knowledge_base_id: Optional[str] = None
+    stale_only: bool = False
 
 
 class ReindexResponse(BaseModel):
@@ -28,68 +39,46 @@ class ReindexResponse(BaseModel):
     documents_reindexed: int
     new_config: dict
     message: str
+    job_id: Optional[str] = None
 
 
 @router.get("/stats")
 async def get_stats():
-    """Get system statistics."""
+    """
+    Get system statistics.
+
+    Served from the periodically refreshed rollup (catalog estimates for
+    large tables), so this never scans production tables. refreshed_at and
+    age_seconds tell how current the numbers are.
+    """
+    from app.utils.stats_rollup import get_stats_rollup
+
     try:
-        engine = create_engine(settings.DATABASE_URL)
-        with engine.connect() as conn:
-            # Count sessions
-            sessions_result = conn.execute(
-                text(f"SELECT COUNT(*) FROM {settings.DB_APP_SCHEMA}.agent_sessions")
-            )
-            sessions_count = sessions_result.scalar() or 0
-            
-            # Count knowledge documents
-            knowledge_result = conn.execute(
-                text(f"SELECT COUNT(*) FROM {settings.DB_APP_SCHEMA}.knowledge_embeddings")
-            )
-            knowledge_count = knowledge_result.scalar() or 0
-            
-            # Get recent sessions with message counts
-            recent_sessions = conn.execute(
-                text(f"""
-                    SELECT 
-                        session_id,
-                        created_at,
-                        jsonb_array_length(COALESCE(runs, '[]'::jsonb)) as message_count
-                    FROM {settings.DB_APP_SCHEMA}.agent_sessions
-                    ORDER BY created_at DESC NULLS LAST
-                    LIMIT 10
-                """)
-            )
-            sessions_list = []
-            for row in recent_sessions:
-                created_at = row[1]
-                if created_at is not None:
-                    if hasattr(created_at, 'isoformat'):
-                        created_at_str = created_at.isoformat()
-                    else:
-                        created_at_str = str(created_at)
-                else:
-                    created_at_str = None
-                    
-                sessions_list.append({
-                    "session_id": str(row[0]),
-                    "created_at": created_at_str,
-                    "message_count": row[2] or 0
-                })
-            
-        return {
-            "status": "success",
-            "stats": {
-                "total_sessions": sessions_count,
-                "total_knowledge_documents": knowledge_count,
-                "ai_provider": settings.AI_PROVIDER,
-                "environment": settings.ENVIRONMENT,
-            },
-            "recent_sessions": sessions_list,
-        }
+        rollup = await asyncio.to_thread(get_stats_rollup)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if rollup is None:
+        # The background refresher builds the first rollup shortly after startup
+        raise HTTPException(
+            status_code=503,
+            detail="Statistics are still being computed",
+            headers={"Retry-After": "5"},
+        )
+
+    return {
+        "status": "success",
+        "stats": {
+            **rollup["stats"],
+            "ai_provider": settings.AI_PROVIDER,
+            "environment": settings.ENVIRONMENT,
+        },
+        "recent_sessions": rollup["recent_sessions"],
+        "refreshed_at": rollup["refreshed_at"],
+        "age_seconds": rollup["age_seconds"],
+        "stale": rollup["stale"],
+    }
+
 
 @router.get("/health")
 async def get_system_health():
@@ -99,14 +88,15 @@ async def get_system_health():
         "ai_provider": "unknown",
     }
     
-    # Check database
-    try:
-        engine = create_engine(settings.DATABASE_URL)
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+    # Database status from the background readiness probes (no query per request)
+    readiness = get_readiness()
+    database = readiness["checks"].get("database")
+    if database is None:
+        health["database"] = "unknown"
+    elif database["status"] == "ok":
         health["database"] = "healthy"
-    except Exception as e:
-        health["database"] = f"unhealthy: {str(e)}"
+    else:
+        health["database"] = f"unhealthy: {database['error']}"
     
     # Check AI provider config
     if settings.AI_PROVIDER:
@@ -117,6 +107,24 @@ async def get_system_health():
     return {
         "status": "success",
         "health": health,
+        "readiness": readiness,
+    }
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Get hit-rate statistics for application caches."""
+    from app.tools.web_search import get_web_search_cache_stats
+    from app.knowledge.embedding_service import get_batching_stats
+    from app.knowledge.embedding_cache import get_embedding_cache_store
+
+    return {
+        "status": "success",
+        "caches": {
+            "web_search": get_web_search_cache_stats(),
+            "embeddings": get_embedding_cache_store().stats(),
+        },
+        "embedding_batching": get_batching_stats(),
     }
 
 
@@ -125,16 +133,12 @@ async def get_embedding_config():
     """
     Get current embedding configuration and check if reindex is needed.
 
-    Compares the stored embedding config with the current AI provider settings.
+    Compares the stored embedding config with the current embedding settings.
     """
-    provider = settings.AI_PROVIDER.lower()
-    current_model = settings.EMBEDDING_MODEL or DEFAULT_EMBEDDING_MODELS.get(provider, "")
-    current_dimensions = EMBEDDING_DIMENSIONS.get(provider, 1536)
-
-    # For Anthropic, we use OpenAI as fallback
-    if provider == "anthropic":
-        current_model = "text-embedding-3-small"
-        current_dimensions = EMBEDDING_DIMENSIONS["openai"]
+    try:
+        provider, current_model, current_dimensions = get_current_embedding_config()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     try:
         engine = create_engine(settings.DATABASE_URL)
@@ -160,9 +164,23 @@ async def get_embedding_config():
                     stored_dimensions != current_dimensions
                 )
 
+                # Rows embedded with another model (e.g. a KB ingested before a
+                # change), counted by the stats refresher for the current config
+                from app.utils.stats_rollup import get_stats_rollup
+                rollup = get_stats_rollup()
+                rollup_stats = rollup["stats"] if rollup else {}
+                stale_documents = 0
+                if rollup_stats.get("stale_embedding") == f"{current_model}/{current_dimensions}":
+                    stale_documents = rollup_stats.get("stale_documents", 0)
+
                 message = None
+                stale_only = False
                 if needs_reindex:
                     message = f"Embedding config changed from {stored_provider}/{stored_model} ({stored_dimensions}d) to {provider}/{current_model} ({current_dimensions}d). Reindex required."
+                elif stale_documents:
+                    needs_reindex = True
+                    stale_only = True
+                    message = f"{stale_documents} documents were not embedded with {current_model} ({current_dimensions}d). Reindex stale documents recommended."
 
                 return EmbeddingConfigResponse(
                     provider=provider,
@@ -171,6 +189,8 @@ async def get_embedding_config():
                     status="configured",
                     needs_reindex=needs_reindex,
                     message=message,
+                    stale_documents=stale_documents,
+                    stale_only=stale_only,
                 )
             else:
                 # No stored config - check if we have documents
@@ -192,28 +212,28 @@ async def get_embedding_config():
 
 
 @router.post("/reindex", response_model=ReindexResponse)
-async def reindex_documents():
+async def reindex_documents(request: Optional[ReindexRequest] = None):
     """
-    Reindex all documents with the current embedding configuration.
+    Start a background job that reindexes documents with the current
+    embedding configuration.
 
     This will:
-    1. Get all existing documents from the knowledge base
-    2. Update the embedding dimensions if changed
-    3. Re-embed all documents with the current embedder
-    4. Update the embedding config in the database
+    1. Update the embedding dimensions if changed (rows are kept, vectors cleared)
+    2. Update the embedding config in the database
+    3. Re-embed documents in batches, in place, checkpointing progress
 
-    WARNING: This operation will clear and rebuild all embeddings.
-    """
-    provider = settings.AI_PROVIDER.lower()
-    current_model = settings.EMBEDDING_MODEL or DEFAULT_EMBEDDING_MODELS.get(provider, "")
-    current_dimensions = EMBEDDING_DIMENSIONS.get(provider, 1536)
+    By default every document is re-embedded. Set knowledge_base_id to limit
+    the job to one knowledge base, and stale_only to skip documents already
+    embedded with the current model and dimension.
 
-    # For Anthropic, we use OpenAI as fallback
-    embedding_provider = provider
-    if provider == "anthropic":
-        embedding_provider = "openai (fallback)"
-        current_model = "text-embedding-3-small"
-        current_dimensions = EMBEDDING_DIMENSIONS["openai"]
+    Track the job with GET /api/admin/reindex/{job_id}; it can be paused,
+    resumed and cancelled. Documents are searchable with their old (or no)
+    vectors until the job reaches them.
+    """
+    try:
+        provider, current_model, current_dimensions = get_current_embedding_config()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Get the embedder
     embedder, embedder_name, dimensions = get_embedder()
@@ -223,120 +243,114 @@ async def reindex_documents():
             detail=f"Cannot create embedder: {embedder_name}"
         )
 
+    request = request or ReindexRequest()
+    if request.knowledge_base_id:
+        try:
+            uuid.UUID(request.knowledge_base_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid knowledge_base_id")
+
+    from app.knowledge.reindex import start_job
+
     try:
-        engine = create_engine(settings.DATABASE_URL)
-        with engine.connect() as conn:
-            # Get all existing documents with their content and metadata
-            documents = conn.execute(
-                text(f"""
-                    SELECT id, name, content, meta_data, knowledge_base_id
-                    FROM {settings.DB_APP_SCHEMA}.knowledge_embeddings
-                    WHERE content IS NOT NULL AND content != ''
-                """)
-            ).fetchall()
+        job = await asyncio.to_thread(
+            start_job,
+            provider,
+            current_model,
+            current_dimensions,
+            knowledge_base_id=request.knowledge_base_id,
+            stale_only=request.stale_only,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting reindex: {str(e)}")
 
-            doc_count = len(documents)
+    if job["status"] == "completed":
+        message = "No documents to reindex. Embedding config and dimensions updated."
+    else:
+        message = f"Reindex job started for {job['total_rows']} documents with {embedder_name}."
 
-            # Check if dimensions need to be updated
-            stored_config = conn.execute(
-                text(f"SELECT dimensions FROM {settings.DB_APP_SCHEMA}.embedding_config WHERE id = 1")
-            ).fetchone()
-            stored_dimensions = stored_config[0] if stored_config else None
+    return ReindexResponse(
+        status=job["status"],
+        documents_reindexed=job["processed_rows"],
+        new_config={"provider": provider, "model": current_model, "dimensions": current_dimensions},
+        message=message,
+        job_id=job["id"],
+    )
 
-            # Update dimensions if changed (even with no documents)
-            if stored_dimensions != current_dimensions:
-                conn.execute(
-                    text(f"SELECT {settings.DB_APP_SCHEMA}.update_embedding_dimension(:dimensions)"),
-                    {"dimensions": current_dimensions}
-                )
-                conn.commit()
-
-            if doc_count == 0:
-                # No documents to reindex - just update config
-                conn.execute(
-                    text(f"""
-                        INSERT INTO {settings.DB_APP_SCHEMA}.embedding_config (id, provider, model, dimensions)
-                        VALUES (1, :provider, :model, :dimensions)
-                        ON CONFLICT (id) DO UPDATE SET
-                            provider = :provider,
-                            model = :model,
-                            dimensions = :dimensions,
-                            updated_at = NOW()
-                    """),
-                    {"provider": provider, "model": current_model, "dimensions": current_dimensions}
-                )
-                conn.commit()
 
-                return ReindexResponse(
-                    status="success",
-                    documents_reindexed=0,
-                    new_config={"provider": provider, "model": current_model, "dimensions": current_dimensions},
-                    message="No documents to reindex. Embedding config and dimensions updated.",
-                )
+@router.get("/reindex")
+async def get_latest_reindex_job():
+    """Get progress of the most recent reindex job."""
+    from app.knowledge.reindex import get_latest_job
 
-            # Collect document data before truncating
-            docs_to_reindex = []
-            for row in documents:
-                docs_to_reindex.append({
-                    "name": row[1],
-                    "content": row[2],
-                    "meta_data": row[3],
-                    "knowledge_base_id": str(row[4]) if row[4] else None,
-                })
-
-            # Update dimensions and truncate table
-            conn.execute(
-                text(f"SELECT {settings.DB_APP_SCHEMA}.update_embedding_dimension(:dimensions)"),
-                {"dimensions": current_dimensions}
-            )
-            conn.commit()
-
-            # Update embedding config
-            conn.execute(
-                text(f"""
-                    INSERT INTO {settings.DB_APP_SCHEMA}.embedding_config (id, provider, model, dimensions)
-                    VALUES (1, :provider, :model, :dimensions)
-                    ON CONFLICT (id) DO UPDATE SET
-                        provider = :provider,
-                        model = :model,
-                        dimensions = :dimensions,
-                        updated_at = NOW()
-                """),
-                {"provider": provider, "model": current_model, "dimensions": current_dimensions}
-            )
-            conn.commit()
-
-        # Re-embed all documents using the knowledge base
-        from app.knowledge.base import get_knowledge_base
-        knowledge = get_knowledge_base(embedder=embedder)
-
-        for doc in docs_to_reindex:
-            knowledge.add_content(
-                text_content=doc["content"],
-                name=doc["name"],
-                metadata=doc["meta_data"] or {},
-            )
-
-            # Update knowledge_base_id if present
-            if doc["knowledge_base_id"]:
-                engine = create_engine(settings.DATABASE_URL)
-                with engine.connect() as conn:
-                    conn.execute(
-                        text(f"""
-                            UPDATE {settings.DB_APP_SCHEMA}.knowledge_embeddings
-                            SET knowledge_base_id = :kb_id
-                            WHERE knowledge_base_id IS NULL
-                        """),
-                        {"kb_id": doc["knowledge_base_id"]}
-                    )
-                    conn.commit()
-
-        return ReindexResponse(
-            status="success",
-            documents_reindexed=len(docs_to_reindex),
-            new_config={"provider": provider, "model": current_model, "dimensions": current_dimensions},
-            message=f"Successfully reindexed {len(docs_to_reindex)} documents with {embedder_name}.",
-        )
+    try:
+        job = await asyncio.to_thread(get_latest_job)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting reindex job: {str(e)}")
+    return {"job": job}
+
+
+@router.get("/reindex/{job_id}")
+async def get_reindex_job(job_id: str):
+    """Get progress of a reindex job."""
+    from app.knowledge.reindex import get_job
+
+    try:
+        job = await asyncio.to_thread(get_job, job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting reindex job: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Reindex job not found")
+    return {"job": job}
+
+
+@router.post("/reindex/{job_id}/{action}")
+async def control_reindex_job(job_id: str, action: str):
+    """Pause, resume or cancel a reindex job."""
+    from app.knowledge.reindex import request_action, resume_job
+
+    if action not in ("pause", "resume", "cancel"):
+        raise HTTPException(status_code=400, detail="Action must be pause, resume or cancel")
+
+    try:
+        if action == "resume":
+            job = await asyncio.to_thread(resume_job, job_id)
+        else:
+            job = await asyncio.to_thread(request_action, job_id, action)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating reindex job: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Reindex job not found")
+    return {"job": job}
+
+
+@router.get("/vector-index")
+async def get_vector_index():
+    """Get the state of the knowledge embeddings vector index."""
+    from app.knowledge.vector_index import get_vector_index_status
 
+    try:
+        return {"index": await asyncio.to_thread(get_vector_index_status)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting vector index: {str(e)}")
+
+
+@router.post("/vector-index/rebuild")
+async def rebuild_vector_index():
+    """
+    Rebuild the vector index concurrently and ANALYZE the table.
+
+    Run after large bulk ingests so ivfflat centroids and list count match
+    the loaded data. Searches keep using the old index until the new one is
+    ready. Below VECTOR_INDEX_MIN_ROWS embedded rows no index is built.
+    """
+    from app.knowledge.vector_index import ensure_vector_index
+
+    try:
+        return {"index": await asyncio.to_thread(ensure_vector_index, True)}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error during reindex: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error rebuilding vector index: {str(e)}")
@@ -2,14 +2,18 @@
 API endpoints for conversations management.
 """
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
 from pydantic import BaseModel
 from typing import Optional, List
 from sqlalchemy import create_engine, text
 from app.config.settings import settings
-from app.config.models import get_model
+from app.config.models import get_aux_model
+from app.utils.aux_tasks import run_aux_task
+from app.utils.touch_buffer import touch
+from datetime import datetime
+import base64
+import json
 import uuid
-import asyncio
 
 router = APIRouter(prefix="/api/conversations", tags=["conversations"])
 
@@ -43,38 +47,153 @@ class GenerateTitleRequest(BaseModel):
     message: str
 
 
+def encode_cursor(*values) -> str:
+    """Opaque pagination cursor for a position (JSON-serializable values)."""
+    payload = json.dumps(list(values))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor from encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
 @router.get("")
 async def list_conversations(
     x_user_id: str = Header(..., alias="X-User-ID"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
 ):
     """
-    List all conversations for the current user.
-    Ordered by most recently updated first.
+    List conversations for the current user, one page at a time.
+    Ordered by most recently updated first; pass next_cursor back as
+    `cursor` to get the following page (null when there are no more).
     """
+    params = {"user_id": x_user_id, "limit": limit + 1}
+    after = ""
+    if cursor:
+        try:
+            updated_at, conversation_id = decode_cursor(cursor)
+            params["cursor_updated_at"] = datetime.fromisoformat(updated_at)
+            params["cursor_id"] = str(uuid.UUID(conversation_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = "AND (updated_at, id) < (:cursor_updated_at, CAST(:cursor_id AS UUID))"
+
     engine = create_engine(settings.DATABASE_URL)
 
     with engine.connect() as conn:
-        result = conn.execute(
+        # Keyset scan on idx_conversations_user_updated; one extra row tells if there is a next page
+        rows = conn.execute(
             text(f"""
                 SELECT id, user_id, title, created_at, updated_at
                 FROM {settings.DB_APP_SCHEMA}.conversations
-                WHERE user_id = :user_id
-                ORDER BY updated_at DESC
+                WHERE user_id = :user_id {after}
+                ORDER BY updated_at DESC, id DESC
+                LIMIT :limit
             """),
-            {"user_id": x_user_id}
-        )
+            params
+        ).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][4].isoformat(), str(rows[-1][0]))
+
+    conversations = []
+    for row in rows:
+        conversations.append({
+            "id": str(row[0]),
+            "user_id": row[1],
+            "title": row[2],
+            "created_at": str(row[3]) if row[3] else None,
+            "updated_at": str(row[4]) if row[4] else None,
+        })
+
+    return {"status": "success", "conversations": conversations, "next_cursor": next_cursor}
+
+
+@router.get("/search")
+async def search_conversations(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    x_user_id: str = Header(..., alias="X-User-ID"),
+):
+    """
+    Full-text search over the current user's conversation messages.
+    Returns conversations ranked by the summed rank of their matching
+    messages, each with a snippet (matches wrapped in <mark>) from the best
+    matching message. Supports web search syntax ("phrase", -word, or).
+    """
+    engine = create_engine(settings.DATABASE_URL)
+    schema = settings.DB_APP_SCHEMA
 
-        conversations = []
-        for row in result:
-            conversations.append({
-                "id": str(row[0]),
-                "user_id": row[1],
-                "title": row[2],
-                "created_at": str(row[3]) if row[3] else None,
-                "updated_at": str(row[4]) if row[4] else None,
-            })
+    with engine.connect() as conn:
+        # Walks the caller's conversations, then their messages by conversation
+        # index, so cost scales with the caller's history, not all users'.
+        # ts_headline only runs for the returned page.
+        rows = conn.execute(
+            text(f"""
+                WITH query AS (
+                    SELECT websearch_to_tsquery('simple', :q) AS tsq
+                ),
+                user_conversations AS MATERIALIZED (
+                    SELECT id FROM {schema}.conversations WHERE user_id = :user_id
+                ),
+                hits AS (
+                    SELECT m.conversation_id, m.id, ts_rank(m.search_vector, query.tsq) AS rank
+                    FROM user_conversations uc
+                    JOIN {schema}.conversation_messages m ON m.conversation_id = uc.id
+                    CROSS JOIN query
+                    WHERE m.search_vector @@ query.tsq
+                ),
+                best AS (
+                    SELECT DISTINCT ON (conversation_id)
+                        conversation_id,
+                        id AS message_pk,
+                        SUM(rank) OVER (PARTITION BY conversation_id) AS score,
+                        COUNT(*) OVER (PARTITION BY conversation_id) AS matches
+                    FROM hits
+                    ORDER BY conversation_id, rank DESC, id DESC
+                ),
+                page AS (
+                    SELECT * FROM best ORDER BY score DESC LIMIT :limit
+                )
+                SELECT
+                    c.id, c.title, c.updated_at, page.score, page.matches,
+                    ts_headline(
+                        'simple', m.content, query.tsq,
+                        'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2'
+                    )
+                FROM page
+                JOIN {schema}.conversations c ON c.id = page.conversation_id
+                JOIN {schema}.conversation_messages m ON m.id = page.message_pk
+                CROSS JOIN query
+                ORDER BY page.score DESC, c.updated_at DESC
+            """),
+            {"q": q, "user_id": x_user_id, "limit": limit}
+        ).fetchall()
+
+    results = [
+        {
+            "id": str(row[0]),
+            "title": row[1],
+            "updated_at": str(row[2]) if row[2] else None,
+            "rank": float(row[3]),
+            "matches": row[4],
+            "snippet": row[5],
+        }
+        for row in rows
+    ]
 
-        return {"status": "success", "conversations": conversations}
+    return {"status": "success", "query": q, "results": results}
 
 
 @router.post("")
@@ -217,6 +336,13 @@ async def delete_conversation(
             """),
             {"session_id": conversation_id}
         )
+        conn.execute(
+            text(f"""
+                DELETE FROM {settings.DB_APP_SCHEMA}.agent_session_runs_archive
+                WHERE session_id = :session_id
+            """),
+            {"session_id": conversation_id}
+        )
 
         # Delete conversation
         conn.execute(
@@ -274,6 +400,13 @@ async def batch_delete_conversations(
             """),
             session_params
         )
+        conn.execute(
+            text(f"""
+                DELETE FROM {settings.DB_APP_SCHEMA}.agent_session_runs_archive
+                WHERE session_id IN ({session_placeholders})
+            """),
+            session_params
+        )
 
         # Delete conversations
         conv_placeholders = ",".join([f":cid{i}" for i in range(len(valid_ids))])
@@ -304,36 +437,58 @@ async def touch_conversation(
 ):
     """
     Update the updated_at timestamp of a conversation.
-    Called when a new message is sent.
+    Called when a new message is sent. Ownership is checked with a primary
+    key lookup; only the timestamp write is buffered, in a batch within
+    CONVERSATION_TOUCH_FLUSH_INTERVAL seconds.
     """
+    try:
+        conversation_id = str(uuid.UUID(conversation_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
     engine = create_engine(settings.DATABASE_URL)
 
     with engine.connect() as conn:
-        result = conn.execute(
+        # Check ownership
+        existing = conn.execute(
             text(f"""
-                UPDATE {settings.DB_APP_SCHEMA}.conversations
-                SET updated_at = NOW()
+                SELECT id FROM {settings.DB_APP_SCHEMA}.conversations
                 WHERE id = :id AND user_id = :user_id
             """),
             {"id": conversation_id, "user_id": x_user_id}
-        )
-        conn.commit()
+        ).fetchone()
 
-        if result.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Conversation not found")
+    if not existing:
+        raise HTTPException(status_code=404, detail="Conversation not found")
 
-        return {"status": "success"}
+    touch(conversation_id, x_user_id)
+    return {"status": "success"}
 
 
 @router.get("/{conversation_id}/history")
 async def get_conversation_history(
     conversation_id: str,
     x_user_id: str = Header(..., alias="X-User-ID"),
+    limit: int = Query(100, ge=1, le=500),
+    before: Optional[str] = None,
 ):
     """
-    Get the message history for a conversation.
-    Extracts messages from Agno agent_sessions.
+    Get the message history for a conversation, newest page first.
+    Returns the last `limit` user/assistant messages (oldest first) before
+    the `before` cursor; pass next_before back as `before` for older ones.
+    Messages are read from app.conversation_messages.
     """
+    params = {"conversation_id": conversation_id, "limit": limit + 1}
+    position = ""
+    if before:
+        try:
+            created_at, message_pk = decode_cursor(before)
+            params["before_created_at"] = datetime.fromisoformat(created_at)
+            params["before_id"] = int(message_pk)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        position = "AND (created_at, id) < (:before_created_at, :before_id)"
+
     engine = create_engine(settings.DATABASE_URL)
 
     with engine.connect() as conn:
@@ -349,38 +504,50 @@ async def get_conversation_history(
         if not existing:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        # Get session data from Agno
-        session = conn.execute(
+        # Backward range scan on idx_conversation_messages_conversation_created
+        rows = conn.execute(
             text(f"""
-                SELECT runs FROM {settings.DB_APP_SCHEMA}.agent_sessions
-                WHERE session_id = :session_id
+                SELECT id, message_id, role, content, created_at
+                FROM {settings.DB_APP_SCHEMA}.conversation_messages
+                WHERE conversation_id = :conversation_id {position}
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit
             """),
-            {"session_id": conversation_id}
-        ).fetchone()
+            params
+        ).fetchall()
+
+    next_before = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_before = encode_cursor(rows[-1][4].isoformat(), rows[-1][0])
+
+    messages = [
+        {
+            "id": row[1],
+            "role": row[2],
+            "content": row[3],
+            "created_at": int(row[4].timestamp()),
+        }
+        for row in reversed(rows)
+    ]
 
-        if not session or not session[0]:
-            return {"status": "success", "messages": []}
+    return {"status": "success", "messages": messages, "next_before": next_before}
 
-        # Extract messages from all runs
-        messages = []
-        runs = session[0]
 
-        for run in runs:
-            run_messages = run.get("messages", [])
-            for msg in run_messages:
-                role = msg.get("role")
-                content = msg.get("content", "")
+async def _generate_title(message: str) -> str:
+    """Ask the auxiliary model for a short title for a conversation."""
+    from agno.models.message import Message
 
-                # Only include user and assistant messages
-                if role in ("user", "assistant") and content:
-                    messages.append({
-                        "id": msg.get("id"),
-                        "role": role,
-                        "content": content,
-                        "created_at": msg.get("created_at"),
-                    })
+    prompt = f"""Generate a very short title (3-5 words maximum) for a conversation that starts with this message.
+Return ONLY the title, nothing else. No quotes, no punctuation at the end.
+
+User message: {message[:500]}"""
 
-        return {"status": "success", "messages": messages}
+    response = await get_aux_model().aresponse(messages=[Message(role="user", content=prompt)])
+    title = (response.content or "").strip().strip('"\'')[:100]
+    if not title:
+        raise ValueError("Model returned an empty title")
+    return title
 
 
 @router.post("/{conversation_id}/generate-title")
@@ -391,7 +558,8 @@ async def generate_title(
 ):
     """
     Generate a title for the conversation based on the first message.
-    Uses the AI model to create a short, relevant title.
+    Uses the auxiliary model through the task queue; no DB connection is
+    held while waiting for it.
     """
     engine = create_engine(settings.DATABASE_URL)
 
@@ -405,58 +573,45 @@ async def generate_title(
             {"id": conversation_id, "user_id": x_user_id}
         ).fetchone()
 
-        if not existing:
-            raise HTTPException(status_code=404, detail="Conversation not found")
+    if not existing:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    # Only generate if title is still default
+    current_title = existing[1]
+    if current_title != "New conversation":
+        return {"status": "success", "title": current_title, "generated": False}
+
+    fallback = False
+    try:
+        title = await run_aux_task(lambda: _generate_title(request.message))
+    except Exception as e:
+        # If AI fails, use truncated message as fallback
+        print(f"[WARNING] Title generation failed: {e}")
+        fallback = True
+        title = request.message[:50].strip()
+        if len(request.message) > 50:
+            title += "..."
 
-        # Only generate if title is still default
-        current_title = existing[1]
-        if current_title != "New conversation":
-            return {"status": "success", "title": current_title, "generated": False}
+    with engine.connect() as conn:
+        # Don't overwrite a title set (e.g. renamed) while the model was running
+        updated = conn.execute(
+            text(f"""
+                UPDATE {settings.DB_APP_SCHEMA}.conversations
+                SET title = :title, updated_at = NOW()
+                WHERE id = :id AND title = 'New conversation'
+            """),
+            {"id": conversation_id, "title": title}
+        )
+        conn.commit()
 
-        # Generate title using AI
-        try:
-            model = get_model()
-            prompt = f"""Generate a very short title (3-5 words maximum) for a conversation that starts with this message.
-Return ONLY the title, nothing else. No quotes, no punctuation at the end.
+        if updated.rowcount == 0:
+            current_title = conn.execute(
+                text(f"SELECT title FROM {settings.DB_APP_SCHEMA}.conversations WHERE id = :id"),
+                {"id": conversation_id}
+            ).scalar()
+            return {"status": "success", "title": current_title, "generated": False}
 
-User message: {request.message[:500]}"""
-
-            # Run sync model in thread pool
-            response = await asyncio.to_thread(
-                model.invoke,
-                prompt
-            )
-
-            # Extract the generated title
-            generated_title = response.content.strip().strip('"\'')[:100]
-
-            # Update the conversation title
-            conn.execute(
-                text(f"""
-                    UPDATE {settings.DB_APP_SCHEMA}.conversations
-                    SET title = :title, updated_at = NOW()
-                    WHERE id = :id
-                """),
-                {"id": conversation_id, "title": generated_title}
-            )
-            conn.commit()
-
-            return {"status": "success", "title": generated_title, "generated": True}
-
-        except Exception as e:
-            # If AI fails, use truncated message as fallback
-            fallback_title = request.message[:50].strip()
-            if len(request.message) > 50:
-                fallback_title += "..."
-
-            conn.execute(
-                text(f"""
-                    UPDATE {settings.DB_APP_SCHEMA}.conversations
-                    SET title = :title, updated_at = NOW()
-                    WHERE id = :id
-                """),
-                {"id": conversation_id, "title": fallback_title}
-            )
-            conn.commit()
-
-            return {"status": "success", "title": fallback_title, "generated": True, "fallback": True}
+    response = {"status": "success", "title": title, "generated": True}
+    if fallback:
+        response["fallback"] = True
+    return response
@@ -8,6 +8,7 @@ import httpx
 import os
 from sqlalchemy import create_engine, text
 from app.config.settings import settings
+from app.utils.http import get_http_client
 
 router = APIRouter(prefix="/api/groups", tags=["groups"])
 
@@ -23,19 +24,19 @@ class GroupCreate(BaseModel):
 
 async def get_admin_token() -> str:
     """Get admin access token from Keycloak."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token",
-            data={
-                "grant_type": "password",
-                "client_id": "admin-cli",
-                "username": KEYCLOAK_ADMIN,
-                "password": KEYCLOAK_ADMIN_PASSWORD,
-            },
-        )
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail="Failed to authenticate with Keycloak")
-        return response.json()["access_token"]
+    client = get_http_client()
+    response = await client.post(
+        f"{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token",
+        data={
+            "grant_type": "password",
+            "client_id": "admin-cli",
+            "username": KEYCLOAK_ADMIN,
+            "password": KEYCLOAK_ADMIN_PASSWORD,
+        },
+    )
+    if response.status_code != 200:
+        raise HTTPException(status_code=500, detail="Failed to authenticate with Keycloak")
+    return response.json()["access_token"]
 
 
 def create_knowledge_base_for_group(group_name: str, group_path: str):
@@ -89,34 +90,34 @@ async def list_groups(
     try:
         token = await get_admin_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups",
+        client = get_http_client()
+        response = await client.get(
+            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(status_code=500, detail="Failed to fetch groups from Keycloak")
+        
+        groups = response.json()
+        
+        # Get member count for each group
+        groups_with_count = []
+        for g in groups:
+            members_resp = await client.get(
+                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{g['id']}/members",
                 headers={"Authorization": f"Bearer {token}"},
             )
+            member_count = len(members_resp.json()) if members_resp.status_code == 200 else 0
             
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail="Failed to fetch groups from Keycloak")
-            
-            groups = response.json()
-            
-            # Get member count for each group
-            groups_with_count = []
-            for g in groups:
-                members_resp = await client.get(
-                    f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{g['id']}/members",
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                member_count = len(members_resp.json()) if members_resp.status_code == 200 else 0
-                
-                groups_with_count.append({
-                    "id": g["id"],
-                    "name": g["name"],
-                    "path": g["path"],
-                    "memberCount": member_count,
-                })
-            
-            return {"status": "success", "groups": groups_with_count}
+            groups_with_count.append({
+                "id": g["id"],
+                "name": g["name"],
+                "path": g["path"],
+                "memberCount": member_count,
+            })
+        
+        return {"status": "success", "groups": groups_with_count}
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Keycloak connection error: {str(e)}")
 
@@ -139,32 +140,32 @@ async def create_group(
     try:
         token = await get_admin_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups",
-                headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
-                json={"name": group_name},
-            )
-            
-            if response.status_code == 409:
-                raise HTTPException(status_code=409, detail="Group already exists")
-            
-            if response.status_code != 201:
-                raise HTTPException(status_code=500, detail=f"Failed to create group: {response.text}")
-            
-            # Get the created group ID
-            location = response.headers.get("Location", "")
-            group_id = location.split("/")[-1]
-            
-            # Create associated knowledge base
-            create_knowledge_base_for_group(group_name, group_path)
-            
-            return {
-                "status": "success", 
-                "message": f"Group '{group_name}' created with associated Knowledge Base", 
-                "id": group_id,
-                "path": group_path,
-            }
+        client = get_http_client()
+        response = await client.post(
+            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups",
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            json={"name": group_name},
+        )
+        
+        if response.status_code == 409:
+            raise HTTPException(status_code=409, detail="Group already exists")
+        
+        if response.status_code != 201:
+            raise HTTPException(status_code=500, detail=f"Failed to create group: {response.text}")
+        
+        # Get the created group ID
+        location = response.headers.get("Location", "")
+        group_id = location.split("/")[-1]
+        
+        # Create associated knowledge base
+        create_knowledge_base_for_group(group_name, group_path)
+        
+        return {
+            "status": "success", 
+            "message": f"Group '{group_name}' created with associated Knowledge Base", 
+            "id": group_id,
+            "path": group_path,
+        }
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Keycloak connection error: {str(e)}")
 
@@ -183,38 +184,38 @@ async def delete_group(
     try:
         token = await get_admin_token()
         
-        async with httpx.AsyncClient() as client:
-            # Check if it's COMPANY group (protected)
-            group_resp = await client.get(
-                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{group_id}",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            
-            if group_resp.status_code == 200:
-                group = group_resp.json()
-                if group.get("name") == "COMPANY":
-                    raise HTTPException(status_code=400, detail="Cannot delete COMPANY group")
-                
-                group_path = group.get("path", "")
-            else:
-                group_path = ""
-            
-            response = await client.delete(
-                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{group_id}",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            
-            if response.status_code == 404:
-                raise HTTPException(status_code=404, detail="Group not found")
-            
-            if response.status_code != 204:
-                raise HTTPException(status_code=500, detail="Failed to delete group")
-            
-            # Delete associated knowledge base
-            if group_path:
-                delete_knowledge_base_for_group(group_path)
+        client = get_http_client()
+        # Check if it's COMPANY group (protected)
+        group_resp = await client.get(
+            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{group_id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        
+        if group_resp.status_code == 200:
+            group = group_resp.json()
+            if group.get("name") == "COMPANY":
+                raise HTTPException(status_code=400, detail="Cannot delete COMPANY group")
             
-            return {"status": "success", "message": "Group and associated Knowledge Base deleted"}
+            group_path = group.get("path", "")
+        else:
+            group_path = ""
+        
+        response = await client.delete(
+            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{group_id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        
+        if response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Group not found")
+        
+        if response.status_code != 204:
+            raise HTTPException(status_code=500, detail="Failed to delete group")
+        
+        # Delete associated knowledge base
+        if group_path:
+            delete_knowledge_base_for_group(group_path)
+        
+        return {"status": "success", "message": "Group and associated Knowledge Base deleted"}
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Keycloak connection error: {str(e)}")
 
@@ -233,32 +234,32 @@ async def get_group_members(
     try:
         token = await get_admin_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{group_id}/members",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            
-            if response.status_code == 404:
-                raise HTTPException(status_code=404, detail="Group not found")
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail="Failed to fetch group members")
-            
-            members = response.json()
-            
-            return {
-                "status": "success",
-                "members": [
-                    {
-                        "id": m["id"],
-                        "username": m.get("username"),
-                        "email": m.get("email"),
-                        "firstName": m.get("firstName"),
-                        "lastName": m.get("lastName"),
-                    }
-                    for m in members
-                ],
-            }
+        client = get_http_client()
+        response = await client.get(
+            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/groups/{group_id}/members",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        
+        if response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Group not found")
+        
+        if response.status_code != 200:
+            raise HTTPException(status_code=500, detail="Failed to fetch group members")
+        
+        members = response.json()
+        
+        return {
+            "status": "success",
+            "members": [
+                {
+                    "id": m["id"],
+                    "username": m.get("username"),
+                    "email": m.get("email"),
+                    "firstName": m.get("firstName"),
+                    "lastName": m.get("lastName"),
+                }
+                for m in members
+            ],
+        }
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Keycloak connection error: {str(e)}")
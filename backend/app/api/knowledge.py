@@ -197,6 +197,7 @@ async def add_document(
 
     try:
         from app.knowledge.base import get_knowledge_base
+        from app.config.embedders import get_current_embedding_config
         knowledge = get_knowledge_base()
         
         # Add content with KB ID in metadata
@@ -210,16 +211,19 @@ async def add_document(
             },
         )
         
-        # Update the knowledge_base_id in the embeddings table
+        # Update the knowledge_base_id and the embedding model in the embeddings table
+        _, embedding_model, embedding_dimensions = get_current_embedding_config()
         engine = create_engine(settings.DATABASE_URL)
         with engine.connect() as conn:
             conn.execute(
                 text(f"""
                     UPDATE {settings.DB_APP_SCHEMA}.knowledge_embeddings
-                    SET knowledge_base_id = :kb_id
+                    SET knowledge_base_id = :kb_id,
+                        embedding_model = :model,
+                        embedding_dimensions = :dimensions
                     WHERE knowledge_base_id IS NULL
                 """),
-                {"kb_id": kb_id}
+                {"kb_id": kb_id, "model": embedding_model, "dimensions": embedding_dimensions}
             )
             conn.commit()
         
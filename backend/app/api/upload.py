@@ -10,6 +10,7 @@ from sqlalchemy import create_engine, text
 from app.config.settings import settings
 from app.extractors import is_supported, extract_text, ALL_EXTENSIONS
 from app.utils.chunking import chunk_text, ChunkingConfig
+from app.utils.metrics import UPLOAD_CHUNKS
 
 router = APIRouter(prefix="/api/kb", tags=["upload"])
 
@@ -213,10 +214,9 @@ async def upload_file(
     # Add to knowledge base with chunking for large files
     try:
         from app.knowledge.base import get_knowledge_base
-        from app.config.embedders import get_embedder
+        from app.config.embedders import get_current_embedding_config
 
-        embedder, _, _ = get_embedder()
-        knowledge = get_knowledge_base(embedder=embedder)
+        knowledge = get_knowledge_base()
 
         # Determine if chunking is needed
         chunks_added = 0
@@ -257,19 +257,24 @@ async def upload_file(
             )
             chunks_added = 1
 
-        # Update knowledge_base_id in embeddings table
+        # Update knowledge_base_id and the embedding model in embeddings table
+        _, embedding_model, embedding_dimensions = get_current_embedding_config()
         engine = create_engine(settings.DATABASE_URL)
         with engine.connect() as conn:
             conn.execute(
                 text(f"""
                     UPDATE {settings.DB_APP_SCHEMA}.knowledge_embeddings
-                    SET knowledge_base_id = :kb_id
+                    SET knowledge_base_id = :kb_id,
+                        embedding_model = :model,
+                        embedding_dimensions = :dimensions
                     WHERE knowledge_base_id IS NULL
                 """),
-                {"kb_id": kb_id}
+                {"kb_id": kb_id, "model": embedding_model, "dimensions": embedding_dimensions}
             )
             conn.commit()
 
+        UPLOAD_CHUNKS.observe(chunks_added)
+
         # Add chunking info to metadata
         metadata["chunks_created"] = chunks_added
 
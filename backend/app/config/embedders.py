@@ -4,6 +4,7 @@ Embedder factory - creates the appropriate embedder based on configuration.
 Supports multiple embedding providers for RAG functionality.
 """
 
+import threading
 from typing import Optional, Tuple
 from agno.knowledge.embedder.base import Embedder
 from app.config.settings import settings
@@ -17,6 +18,7 @@ EMBEDDING_DIMENSIONS = {
     "ollama": 768,       # nomic-embed-text (default)
     "lmstudio": 768,     # nomic-embed-text (default for local)
     "anthropic": 1536,   # fallback to OpenAI
+    "hashing": 768,      # offline feature hashing (EMBEDDING_DIMENSION to change)
 }
 
 # Default embedding models for each provider
@@ -27,18 +29,80 @@ DEFAULT_EMBEDDING_MODELS = {
     "ollama": "nomic-embed-text",
     "lmstudio": "text-embedding-nomic-embed-text-v1.5",
     "anthropic": "text-embedding-3-small",  # fallback to OpenAI
+    "hashing": "feature-hashing",
 }
 
+# Native dimensions of models that accept a shorter output size
+# (EMBEDDING_DIMENSION); vectors are truncated and renormalized by the provider
+REDUCIBLE_EMBEDDING_MODELS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+# Embedder built once per process (see get_embedder)
+_embedder: Optional[Tuple[Embedder, str, int]] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedding_provider() -> str:
+    """
+    Get the embedding provider: EMBEDDING_PROVIDER if set, else AI_PROVIDER.
+
+    Lets embeddings use a different provider than chat, e.g. the offline
+    'hashing' provider for load tests and CI.
+    """
+    return (settings.EMBEDDING_PROVIDER or settings.AI_PROVIDER).lower()
+
 
 def get_embedder() -> Tuple[Optional[Embedder], str, int]:
     """
     Get the appropriate embedder based on the configured AI provider.
 
+    When EMBEDDING_BATCHING_ENABLED is set, the provider embedder is wrapped
+    so concurrent calls are coalesced into batched provider requests. When
+    EMBEDDING_CACHE_ENABLED is set, vectors are reused from the persistent
+    embedding cache before calling the provider.
+
+    The embedder is built once per process and reused, so its provider
+    client and HTTP connection pool are shared by all requests.
+
     Returns:
         Tuple of (embedder, provider_name, dimensions)
         Returns (None, error_message, 0) if embedder cannot be created.
     """
-    provider = settings.AI_PROVIDER.lower()
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            result = _build_embedder()
+            if result[0] is None:
+                # Do not memoize failures
+                return result
+            _embedder = result
+        return _embedder
+
+
+def _build_embedder() -> Tuple[Optional[Embedder], str, int]:
+    """Create the provider embedder and apply batching/caching wrappers."""
+    embedder, provider_name, dimensions = _create_embedder()
+
+    if embedder is not None and settings.EMBEDDING_BATCHING_ENABLED:
+        from app.knowledge.embedding_service import BatchingEmbedder
+        embedder = BatchingEmbedder(embedder=embedder)
+
+    if embedder is not None and settings.EMBEDDING_CACHE_ENABLED:
+        from app.knowledge.embedding_cache import CachedEmbedder
+        provider = get_embedding_provider()
+        # Anthropic uses OpenAI embeddings, so share their cache entries
+        cache_provider = "openai" if provider == "anthropic" else provider
+        embedder = CachedEmbedder(embedder=embedder, model=f"{cache_provider}/{embedder.id}")
+
+    return embedder, provider_name, dimensions
+
+
+def _create_embedder() -> Tuple[Optional[Embedder], str, int]:
+    """Create the provider embedder for the configured AI provider."""
+    provider = get_embedding_provider()
     embedding_model = settings.EMBEDDING_MODEL or DEFAULT_EMBEDDING_MODELS.get(provider, "")
 
     try:
@@ -60,6 +124,9 @@ def get_embedder() -> Tuple[Optional[Embedder], str, int]:
         elif provider == "anthropic":
             return _create_anthropic_fallback_embedder(embedding_model)
 
+        elif provider == "hashing":
+            return _create_hashing_embedder(embedding_model)
+
         else:
             return None, f"Unknown AI provider: {provider}", 0
 
@@ -76,12 +143,14 @@ def _create_openai_embedder(model: str) -> Tuple[Embedder, str, int]:
 
     from agno.knowledge.embedder.openai import OpenAIEmbedder
 
+    dimensions = get_embedding_dimensions("openai", model)
     embedder = OpenAIEmbedder(
         id=model,
         api_key=settings.OPENAI_API_KEY,
+        dimensions=dimensions,
     )
 
-    return embedder, f"OpenAI ({model})", EMBEDDING_DIMENSIONS["openai"]
+    return embedder, f"OpenAI ({model})", dimensions
 
 
 def _create_gemini_embedder(model: str) -> Tuple[Embedder, str, int]:
@@ -162,18 +231,72 @@ def _create_anthropic_fallback_embedder(model: str) -> Tuple[Embedder, str, int]
     # Use OpenAI model for embeddings
     openai_model = model if model != DEFAULT_EMBEDDING_MODELS["anthropic"] else "text-embedding-3-small"
 
+    dimensions = get_embedding_dimensions("anthropic", openai_model)
     embedder = OpenAIEmbedder(
         id=openai_model,
         api_key=settings.OPENAI_API_KEY,
+        dimensions=dimensions,
     )
 
     print("[WARNING] Anthropic does not provide embeddings. Using OpenAI as fallback.")
 
-    return embedder, f"OpenAI fallback ({openai_model})", EMBEDDING_DIMENSIONS["anthropic"]
+    return embedder, f"OpenAI fallback ({openai_model})", dimensions
+
+
+def _create_hashing_embedder(model: str) -> Tuple[Embedder, str, int]:
+    """Create the offline feature-hashing embedder (no provider call)."""
+    from app.knowledge.hashing_embedder import HashingEmbedder
+
+    dimensions = get_embedding_dimensions("hashing")
+    embedder = HashingEmbedder(
+        id=model,
+        dimensions=dimensions,
+    )
 
+    return embedder, f"Hashing ({model})", dimensions
 
-def get_embedding_dimensions(provider: str = None) -> int:
-    """Get the embedding dimensions for a provider."""
+
+def get_embedding_dimensions(provider: str = None, model: str = None) -> int:
+    """
+    Get the embedding dimensions for a provider and model.
+
+    EMBEDDING_DIMENSION overrides the default for the hashing provider and for
+    OpenAI text-embedding-3 models, which can return shorter vectors. It is
+    ignored for other models, whose output size is fixed.
+
+    Raises:
+        ValueError: If EMBEDDING_DIMENSION exceeds the model's native size.
+    """
     if provider is None:
-        provider = settings.AI_PROVIDER.lower()
+        provider = get_embedding_provider()
+    requested = settings.EMBEDDING_DIMENSION
+
+    if provider == "hashing" and requested > 0:
+        return requested
+
+    if provider in ("openai", "anthropic") and model in REDUCIBLE_EMBEDDING_MODELS:
+        native = REDUCIBLE_EMBEDDING_MODELS[model]
+        if requested > native:
+            raise ValueError(f"EMBEDDING_DIMENSION={requested} exceeds {native} dimensions of {model}")
+        return requested if requested > 0 else native
+
     return EMBEDDING_DIMENSIONS.get(provider, 1536)
+
+
+def get_current_embedding_config() -> Tuple[str, str, int]:
+    """
+    Get the (provider, model, dimensions) currently configured for embeddings.
+
+    Used to compare against the stored embedding_config to detect when a
+    reindex is needed.
+    """
+    provider = get_embedding_provider()
+    model = settings.EMBEDDING_MODEL or DEFAULT_EMBEDDING_MODELS.get(provider, "")
+
+    # For Anthropic, we use OpenAI as fallback
+    if provider == "anthropic":
+        model = "text-embedding-3-small"
+
+    dimensions = get_embedding_dimensions(provider, model)
+
+    return provider, model, dimensions
@@ -2,39 +2,98 @@
 AI Model factory - creates the appropriate model based on configuration.
 """
 
+import threading
 from app.config.settings import settings
 
 
+# Default model IDs per provider: chat tier and auxiliary tier (titles and
+# other housekeeping). Local providers reuse the chat model.
+DEFAULT_CHAT_MODELS = {
+    "openai": "gpt-4o",
+    "anthropic": "claude-sonnet-4-20250514",
+    "gemini": "gemini-2.0-flash",
+    "mistral": "mistral-large-latest",
+    "ollama": "llama3.2",
+    "lmstudio": "local-model",
+}
+DEFAULT_AUX_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-haiku-4-5",
+    "gemini": "gemini-2.0-flash-lite",
+    "mistral": "mistral-small-latest",
+}
+
+# Models built once per process (see get_model, get_aux_model)
+_model = None
+_aux_model = None
+_model_lock = threading.Lock()
+
+
 def get_model():
     """
     Get the AI model based on the configured provider.
 
     Returns the appropriate Agno model instance.
     Uses AI_MODEL env var if set, otherwise falls back to provider defaults.
+    The instance is created once and reused so its provider client and
+    connection pool are shared across requests.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            from app.utils.metrics import instrument_model
+            provider = settings.AI_PROVIDER.lower()
+            _model = instrument_model(
+                _create_model(settings.AI_MODEL or DEFAULT_CHAT_MODELS.get(provider, ""))
+            )
+        return _model
+
+
+def get_aux_model():
+    """
+    Get the auxiliary (small, cheap) model for titles and other housekeeping.
+
+    Uses AI_AUX_MODEL if set, otherwise the provider's small model, so this
+    work does not count against the chat model's rate limit. Local providers
+    (Ollama, LM Studio) fall back to the chat model ID.
     """
+    global _aux_model
+    with _model_lock:
+        if _aux_model is None:
+            provider = settings.AI_PROVIDER.lower()
+            _aux_model = _create_model(
+                settings.AI_AUX_MODEL
+                or DEFAULT_AUX_MODELS.get(provider)
+                or settings.AI_MODEL
+                or DEFAULT_CHAT_MODELS.get(provider, "")
+            )
+        return _aux_model
+
+
+def _create_model(model_id: str):
+    """Create the Agno model instance for the configured provider."""
     provider = settings.AI_PROVIDER.lower()
-    model_id = settings.AI_MODEL  # Custom model ID (optional)
 
     if provider == "openai":
         from agno.models.openai import OpenAIChat
-        return OpenAIChat(id=model_id or "gpt-4o")
+        return OpenAIChat(id=model_id)
 
     elif provider == "anthropic":
         from agno.models.anthropic import AnthropicChat
-        return AnthropicChat(id=model_id or "claude-sonnet-4-20250514")
+        return AnthropicChat(id=model_id)
 
     elif provider == "gemini":
         from agno.models.google import GeminiChat
-        return GeminiChat(id=model_id or "gemini-2.0-flash")
+        return GeminiChat(id=model_id)
 
     elif provider == "mistral":
         from agno.models.mistral import MistralChat
-        return MistralChat(id=model_id or "mistral-large-latest")
+        return MistralChat(id=model_id)
 
     elif provider == "ollama":
         from agno.models.ollama import Ollama
         base_url = settings.AI_URL or "http://host.docker.internal:11434"
-        return Ollama(id=model_id or "llama3.2", host=base_url)
+        return Ollama(id=model_id, host=base_url)
 
     elif provider == "lmstudio":
         # Use OpenAILike instead of native LMStudio connector (bug workaround)
@@ -45,7 +104,7 @@ def get_model():
         if not base_url.endswith("/v1"):
             base_url = f"{base_url}/v1"
         return OpenAILike(
-            id=model_id or "local-model",
+            id=model_id,
             base_url=base_url,
             api_key="not-needed"
         )
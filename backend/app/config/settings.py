@@ -24,9 +24,12 @@ class Settings:
     AI_PROVIDER: str = os.getenv("AI_PROVIDER", "openai")
     AI_MODEL: str = os.getenv("AI_MODEL", "")  # Chat model ID (optional, uses provider default)
     AI_URL: str = os.getenv("AI_URL", "")  # Custom URL for local providers (Ollama, LM Studio)
+    AI_AUX_MODEL: str = os.getenv("AI_AUX_MODEL", "")  # Auxiliary model ID for titles (optional, uses provider's small model)
 
     # Embedding Model (for RAG)
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "")  # Embedding model ID (optional, uses provider default)
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "")  # Embedding provider (optional, defaults to AI_PROVIDER; 'hashing' = offline)
+    EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", "0"))  # Vector size (optional, 0 = provider default; hashing and OpenAI text-embedding-3 only)
     
     # API Keys
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -59,11 +62,68 @@ class Settings:
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
 
+    # Outbound HTTP client (shared connection pool for web search and Keycloak)
+    HTTP_CLIENT_TIMEOUT: float = float(os.getenv("HTTP_CLIENT_TIMEOUT", "10.0"))  # Default request timeout (seconds)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "100"))  # Total open connections
+    HTTP_CLIENT_MAX_KEEPALIVE: int = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", "20"))  # Idle connections kept alive
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30.0"))  # Idle timeout (seconds)
+    HTTP_CLIENT_HTTP2: bool = os.getenv("HTTP_CLIENT_HTTP2", "false").lower() == "true"  # Requires the 'h2' package
+
     # Web Search Configuration (for DuckDuckGo fallback)
     WEB_SEARCH_ENABLED: bool = os.getenv("WEB_SEARCH_ENABLED", "true").lower() == "true"
+    WEB_SEARCH_BACKEND: str = os.getenv("WEB_SEARCH_BACKEND", "duckduckgo")
+    WEB_SEARCH_BACKEND_URL: str = os.getenv("WEB_SEARCH_BACKEND_URL", "")  # Override backend endpoint (e.g. local fixture server)
     WEB_SEARCH_NUM_RESULTS: int = int(os.getenv("WEB_SEARCH_NUM_RESULTS", "5"))
+    WEB_SEARCH_EXTRA_CANDIDATES: int = int(os.getenv("WEB_SEARCH_EXTRA_CANDIDATES", "3"))  # Extra results fetched to hedge slow sites
     WEB_SEARCH_TIMEOUT: float = float(os.getenv("WEB_SEARCH_TIMEOUT", "10.0"))
-    WEB_SEARCH_DELAY: float = float(os.getenv("WEB_SEARCH_DELAY", "0.5"))
+    WEB_SEARCH_DELAY: float = float(os.getenv("WEB_SEARCH_DELAY", "0.5"))  # Min delay between requests to the same host
+    WEB_SEARCH_CONCURRENCY: int = int(os.getenv("WEB_SEARCH_CONCURRENCY", "5"))  # Max parallel page fetches
+    WEB_SEARCH_DEADLINE: float = float(os.getenv("WEB_SEARCH_DEADLINE", "15.0"))  # Overall budget for page fetches (seconds)
+    WEB_SEARCH_MAX_PAGE_BYTES: int = int(os.getenv("WEB_SEARCH_MAX_PAGE_BYTES", "1048576"))  # Stop reading a page after this many bytes
+
+    # Web Search Cache (query -> results, URL -> extracted page)
+    WEB_SEARCH_CACHE_ENABLED: bool = os.getenv("WEB_SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    WEB_SEARCH_CACHE_BACKEND: str = os.getenv("WEB_SEARCH_CACHE_BACKEND", "memory")  # memory or postgres (shared across workers)
+    WEB_SEARCH_QUERY_CACHE_TTL: float = float(os.getenv("WEB_SEARCH_QUERY_CACHE_TTL", "600"))  # Seconds
+    WEB_SEARCH_QUERY_CACHE_SIZE: int = int(os.getenv("WEB_SEARCH_QUERY_CACHE_SIZE", "1000"))  # Max entries in memory
+    WEB_SEARCH_PAGE_CACHE_TTL: float = float(os.getenv("WEB_SEARCH_PAGE_CACHE_TTL", "3600"))  # Seconds
+    WEB_SEARCH_PAGE_CACHE_SIZE: int = int(os.getenv("WEB_SEARCH_PAGE_CACHE_SIZE", "500"))  # Max entries in memory
+
+    # Embedding micro-batching (coalesces concurrent embedding calls)
+    EMBEDDING_BATCHING_ENABLED: bool = os.getenv("EMBEDDING_BATCHING_ENABLED", "true").lower() == "true"
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))  # Max texts per provider call
+    EMBEDDING_BATCH_MAX_TOKENS: int = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "16000"))  # Approx. token budget per call
+    EMBEDDING_BATCH_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))  # Max wait to fill a batch
+
+    # Persistent embedding cache (app.embedding_cache)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_MAX_ROWS: int = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "200000"))  # LRU eviction above this
+
+    # Background reindex jobs
+    REINDEX_BATCH_SIZE: int = int(os.getenv("REINDEX_BATCH_SIZE", "64"))  # Rows embedded and written per batch
+    REINDEX_PARALLELISM: int = int(os.getenv("REINDEX_PARALLELISM", "4"))  # Batches in flight at once
+    VECTOR_INDEX_MAINTENANCE_WORK_MEM: str = os.getenv("VECTOR_INDEX_MAINTENANCE_WORK_MEM", "")  # e.g. 512MB (optional, speeds up index builds)
+    VECTOR_INDEX_MIN_ROWS: int = int(os.getenv("VECTOR_INDEX_MIN_ROWS", "1000"))  # Below this, searches scan exactly and no ivfflat index is built
+    VECTOR_INDEX_CHECK_INTERVAL: float = float(os.getenv("VECTOR_INDEX_CHECK_INTERVAL", "300"))  # Seconds between checks for a missing or outgrown index
+
+    # Admin dashboard statistics rollup
+    ADMIN_STATS_REFRESH_INTERVAL: int = int(os.getenv("ADMIN_STATS_REFRESH_INTERVAL", "60"))  # Seconds between refreshes
+
+    # Readiness probes (background dependency checks served by /ready)
+    READINESS_PROBE_INTERVAL: float = float(os.getenv("READINESS_PROBE_INTERVAL", "30"))  # Seconds between probe rounds
+    READINESS_PROBE_TIMEOUT: float = float(os.getenv("READINESS_PROBE_TIMEOUT", "5"))  # Per-probe timeout (seconds)
+    READINESS_EMBEDDER_CALL_INTERVAL: float = float(os.getenv("READINESS_EMBEDDER_CALL_INTERVAL", "0"))  # Seconds between real (billed) embedding calls; 0 = only check the embedder is configured
+
+    # Conversation touches (buffered, written in one batch per interval)
+    CONVERSATION_TOUCH_FLUSH_INTERVAL: float = float(os.getenv("CONVERSATION_TOUCH_FLUSH_INTERVAL", "5"))  # Seconds
+
+    # Agent session compaction (older runs move to app.agent_session_runs_archive)
+    SESSION_LIVE_RUNS: int = int(os.getenv("SESSION_LIVE_RUNS", "20"))  # Runs kept in agent_sessions.runs (at least num_history_runs + 1)
+
+    # Auxiliary model task queue (title generation)
+    AUX_TASK_CONCURRENCY: int = int(os.getenv("AUX_TASK_CONCURRENCY", "2"))  # Auxiliary model calls in flight at once
+    AUX_TASK_QUEUE_SIZE: int = int(os.getenv("AUX_TASK_QUEUE_SIZE", "100"))  # Queued tasks before new ones are rejected
+    AUX_TASK_TIMEOUT: float = float(os.getenv("AUX_TASK_TIMEOUT", "30"))  # Max wait for a task, including queueing (seconds)
 
     # RAG Chunking Configuration
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1000"))  # Characters per chunk
@@ -2,26 +2,59 @@
 Knowledge base configuration for RAG.
 """
 
+import threading
 from typing import Optional
 from agno.knowledge.knowledge import Knowledge
 from agno.knowledge.embedder.base import Embedder
 from agno.vectordb.pgvector import PgVector, SearchType
 from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+# Default knowledge base, built once per process (see get_knowledge_base)
+_knowledge: Optional[Knowledge] = None
+_knowledge_lock = threading.Lock()
 
 
 def get_knowledge_base(embedder: Optional[Embedder] = None) -> Knowledge:
     """
-    Create and return the knowledge base for RAG.
+    Get the knowledge base for RAG.
+
+    Without an embedder, returns the shared instance built with the configured
+    embedder from get_embedder(), so its PgVector engine and connection pool
+    are reused by every caller. Passing an embedder builds a separate instance.
 
     Args:
-        embedder: Optional embedder to use. If None, uses PgVector default (OpenAI).
+        embedder: Optional embedder to use. If None, uses the configured
+            embedder from get_embedder().
 
     Returns:
         Knowledge: Configured knowledge base with PgVector.
+
+    Raises:
+        RuntimeError: If no embedder is given and the configured one cannot be
+            created. Nothing is cached, so the next call tries again (PgVector's
+            implicit OpenAI default would write vectors with the wrong model).
     """
+    global _knowledge
+    if embedder is not None:
+        return _create_knowledge_base(embedder)
+
+    with _knowledge_lock:
+        if _knowledge is None:
+            from app.config.embedders import get_embedder
+            default_embedder, error, _ = get_embedder()
+            if default_embedder is None:
+                raise RuntimeError(f"Embedder unavailable: {error}")
+            _knowledge = _create_knowledge_base(default_embedder)
+        return _knowledge
+
+
+def _create_knowledge_base(embedder: Optional[Embedder]) -> Knowledge:
+    """Create a Knowledge instance backed by PgVector."""
     vector_db = PgVector(
         table_name="knowledge_embeddings",
-        db_url=settings.DATABASE_URL_BASE,
+        db_engine=create_instrumented_engine("knowledge", settings.DATABASE_URL_BASE),
         schema=settings.DB_APP_SCHEMA,
         search_type=SearchType.hybrid,
         embedder=embedder,
@@ -0,0 +1,297 @@
+"""
+Persistent embedding cache.
+
+Vectors are stored in app.embedding_cache keyed by (model, dimensions,
+content hash). CachedEmbedder wraps the embedder returned by get_embedder()
+so every call site (uploads, add_document, reindex, search queries) reuses
+previously computed vectors instead of calling the provider again.
+
+Lookups are plain SELECTs. Hits are counted in memory and written back
+(hit_count, last_used_at) in one batched UPDATE every HIT_FLUSH_INTERVAL
+seconds or HIT_FLUSH_BATCH hits, so the LRU order is approximate.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from agno.knowledge.embedder.base import Embedder
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 hex digest of a text."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCacheStore:
+    """Reads and writes cached vectors, with size-based LRU eviction."""
+
+    EVICT_EVERY = 500  # Writes between eviction passes
+    HIT_FLUSH_INTERVAL = 30  # Seconds between hit write-backs
+    HIT_FLUSH_BATCH = 500  # Distinct hit rows that trigger an early write-back
+
+    def __init__(self, max_rows: int):
+        self.max_rows = max_rows
+        self._engine = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        # (model, dimensions, content_hash) -> hits not yet written back
+        self._pending_hits: Dict[Tuple[str, int, str], int] = {}
+        self._last_hit_flush = time.monotonic()
+
+        # Statistics (this worker)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.errors = 0
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = create_instrumented_engine("embedding_cache", settings.DATABASE_URL, pool_pre_ping=True)
+        return self._engine
+
+    def get_many(self, model: str, dimensions: int, hashes: List[str]) -> Dict[str, List[float]]:
+        """Look up vectors by content hash; hits are recorded for the next write-back."""
+        if not hashes:
+            return {}
+
+        try:
+            with self._get_engine().connect() as conn:
+                rows = conn.execute(
+                    text(f"""
+                        SELECT content_hash, embedding::text
+                        FROM {settings.DB_APP_SCHEMA}.embedding_cache
+                        WHERE model = :model AND dimensions = :dimensions
+                          AND content_hash = ANY(:hashes)
+                    """),
+                    {"model": model, "dimensions": dimensions, "hashes": list(set(hashes))}
+                ).fetchall()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[WARNING] Embedding cache lookup failed: {e}")
+            return {}
+
+        found = {row[0]: json.loads(row[1]) for row in rows}
+        with self._lock:
+            self.hits += sum(1 for h in hashes if h in found)
+            self.misses += sum(1 for h in hashes if h not in found)
+            for h in found:
+                key = (model, dimensions, h)
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            flush = bool(self._pending_hits) and (
+                len(self._pending_hits) >= self.HIT_FLUSH_BATCH
+                or time.monotonic() - self._last_hit_flush >= self.HIT_FLUSH_INTERVAL
+            )
+        if flush:
+            self.flush_hits()
+        return found
+
+    def flush_hits(self) -> None:
+        """Write pending hit counts and last_used_at in one UPDATE."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._last_hit_flush = time.monotonic()
+        if not pending:
+            return
+
+        # Sorted so concurrent flushes from other workers lock rows in the same order
+        keys = sorted(pending)
+        try:
+            with self._get_engine().connect() as conn:
+                conn.execute(
+                    text(f"""
+                        UPDATE {settings.DB_APP_SCHEMA}.embedding_cache c
+                        SET hit_count = c.hit_count + t.hits, last_used_at = NOW()
+                        FROM unnest(
+                            CAST(:models AS VARCHAR[]), CAST(:dimensions AS INTEGER[]),
+                            CAST(:hashes AS VARCHAR[]), CAST(:hits AS INTEGER[])
+                        ) AS t(model, dimensions, content_hash, hits)
+                        WHERE c.model = t.model AND c.dimensions = t.dimensions
+                          AND c.content_hash = t.content_hash
+                    """),
+                    {
+                        "models": [k[0] for k in keys],
+                        "dimensions": [k[1] for k in keys],
+                        "hashes": [k[2] for k in keys],
+                        "hits": [pending[k] for k in keys],
+                    }
+                )
+                conn.commit()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[WARNING] Embedding cache hit write-back failed: {e}")
+
+    def put_many(self, model: str, dimensions: int, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors by content hash (empty vectors are skipped)."""
+        params = [
+            {"model": model, "dimensions": dimensions, "hash": h, "embedding": json.dumps(v)}
+            for h, v in vectors.items() if v
+        ]
+        if not params:
+            return
+
+        try:
+            with self._get_engine().connect() as conn:
+                conn.execute(
+                    text(f"""
+                        INSERT INTO {settings.DB_APP_SCHEMA}.embedding_cache
+                            (model, dimensions, content_hash, embedding)
+                        VALUES (:model, :dimensions, :hash, CAST(:embedding AS vector))
+                        ON CONFLICT (model, dimensions, content_hash) DO NOTHING
+                    """),
+                    params
+                )
+
+                with self._lock:
+                    self.stored += len(params)
+                    self._writes += len(params)
+                    evict = self._writes >= self.EVICT_EVERY
+                    if evict:
+                        self._writes = 0
+                if evict:
+                    self._evict(conn)
+                conn.commit()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[WARNING] Embedding cache write failed: {e}")
+
+    def _evict(self, conn) -> None:
+        """
+        Delete least recently used rows above max_rows.
+
+        The row count is the planner's estimate (pg_class.reltuples, kept
+        current by autovacuum), so eviction never runs COUNT(*). Nothing is
+        evicted until the table has been analyzed once.
+        """
+        result = conn.execute(
+            text(f"""
+                DELETE FROM {settings.DB_APP_SCHEMA}.embedding_cache
+                WHERE ctid IN (
+                    SELECT ctid FROM {settings.DB_APP_SCHEMA}.embedding_cache
+                    ORDER BY last_used_at ASC
+                    LIMIT (
+                        SELECT GREATEST(c.reltuples::bigint - :max_rows, 0)
+                        FROM pg_class c
+                        JOIN pg_namespace n ON n.oid = c.relnamespace
+                        WHERE n.nspname = :schema AND c.relname = 'embedding_cache'
+                    )
+                )
+            """),
+            {"max_rows": self.max_rows, "schema": settings.DB_APP_SCHEMA}
+        )
+        with self._lock:
+            self.evicted += result.rowcount
+
+    def stats(self) -> dict:
+        """Get reuse statistics for this worker."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stored": self.stored,
+                "evicted": self.evicted,
+                "errors": self.errors,
+            }
+
+
+_store: Optional[EmbeddingCacheStore] = None
+
+
+def get_embedding_cache_store() -> EmbeddingCacheStore:
+    """Get the process-wide embedding cache store."""
+    global _store
+    if _store is None:
+        _store = EmbeddingCacheStore(max_rows=settings.EMBEDDING_CACHE_MAX_ROWS)
+    return _store
+
+
+@dataclass
+class CachedEmbedder(Embedder):
+    """Embedder wrapper that consults the persistent embedding cache first."""
+
+    embedder: Optional[Embedder] = None
+    model: str = ""  # Cache key, e.g. "openai/text-embedding-3-small"
+    id: Optional[str] = None
+
+    def __post_init__(self):
+        if self.embedder is None:
+            raise ValueError("CachedEmbedder requires an embedder to wrap")
+        self.id = getattr(self.embedder, "id", None)
+        self.dimensions = self.embedder.dimensions
+        self.enable_batch = self.embedder.enable_batch
+        self.batch_size = self.embedder.batch_size
+        self._store = get_embedding_cache_store()
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        h = content_hash(text)
+        cached = self._store.get_many(self.model, self.dimensions, [h])
+        if h in cached:
+            return cached[h], None
+
+        embedding, usage = self.embedder.get_embedding_and_usage(text)
+        self._store.put_many(self.model, self.dimensions, {h: embedding})
+        return embedding, usage
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        return (await self.async_get_embedding_and_usage(text))[0]
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        h = content_hash(text)
+        cached = await asyncio.to_thread(self._store.get_many, self.model, self.dimensions, [h])
+        if h in cached:
+            return cached[h], None
+
+        embedding, usage = await self.embedder.async_get_embedding_and_usage(text)
+        await asyncio.to_thread(self._store.put_many, self.model, self.dimensions, {h: embedding})
+        return embedding, usage
+
+    async def async_get_embeddings_batch_and_usage(
+        self, texts: List[str]
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        hashes = [content_hash(t) for t in texts]
+        cached = await asyncio.to_thread(self._store.get_many, self.model, self.dimensions, hashes)
+
+        # Embed only the misses (once per distinct text)
+        missing = {h: t for h, t in zip(hashes, texts) if h not in cached}
+        fresh: Dict[str, Tuple[List[float], Optional[Dict]]] = {}
+        if missing:
+            miss_hashes = list(missing)
+            miss_texts = [missing[h] for h in miss_hashes]
+            if hasattr(self.embedder, "async_get_embeddings_batch_and_usage"):
+                embeddings, usages = await self.embedder.async_get_embeddings_batch_and_usage(miss_texts)
+            else:
+                results = await asyncio.gather(*(self.embedder.async_get_embedding_and_usage(t) for t in miss_texts))
+                embeddings, usages = [r[0] for r in results], [r[1] for r in results]
+
+            for i, h in enumerate(miss_hashes):
+                fresh[h] = (embeddings[i], usages[i] if i < len(usages) else None)
+            await asyncio.to_thread(
+                self._store.put_many, self.model, self.dimensions, {h: e for h, (e, _) in fresh.items()}
+            )
+
+        embeddings_out, usages_out = [], []
+        for h in hashes:
+            if h in cached:
+                embeddings_out.append(cached[h])
+                usages_out.append(None)
+            else:
+                embeddings_out.append(fresh[h][0])
+                usages_out.append(fresh[h][1])
+        return embeddings_out, usages_out
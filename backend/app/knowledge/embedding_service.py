@@ -0,0 +1,202 @@
+"""
+Embedding service layer: cross-request micro-batching in front of an Embedder.
+
+Concurrent uploads, searches and agent tool calls each embed one text at a
+time. BatchingEmbedder collects texts that arrive within a few milliseconds
+and sends them to the provider as a single batched call, then fans the
+results back out to each caller.
+
+Batches run on one background event loop shared by all callers, so sync
+callers (PgVector search) and async callers (ingestion) on any thread or
+loop are coalesced together.
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from agno.knowledge.embedder.base import Embedder
+from app.config.settings import settings
+from app.utils.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_DURATION, observe
+
+
+# Background loop that runs all batchers
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+# One batcher per provider/model, shared by every wrapper of that model
+_batchers: Dict[str, "EmbeddingBatcher"] = {}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get (or start) the background event loop that runs embedding batches."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="embedding-batcher", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class EmbeddingBatcher:
+    """
+    Collects embedding requests and flushes them as batched provider calls.
+
+    A batch is flushed when it reaches max_batch_size texts, when adding a
+    text would exceed max_batch_tokens, or max_wait_ms after its first text.
+    All methods except submit() run on the background loop.
+    """
+
+    def __init__(self, embedder: Embedder, max_batch_size: int, max_batch_tokens: int, max_wait_ms: float):
+        self.embedder = embedder
+        self.label = f"{type(embedder).__name__}:{getattr(embedder, 'id', '')}"
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait_ms / 1000
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Statistics
+        self.requests = 0
+        self.batches = 0
+
+    def submit(self, text: str):
+        """Submit a text from any thread; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self._enqueue(text), _get_loop())
+
+    async def _enqueue(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        loop = asyncio.get_running_loop()
+        tokens = _estimate_tokens(text)
+
+        # Flush first if this text would push the batch over the token budget
+        if self._pending and self._pending_tokens + tokens > self.max_batch_tokens:
+            self._flush()
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self._pending_tokens += tokens
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending texts as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        self._pending_tokens = 0
+        if batch:
+            self.batches += 1
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        EMBEDDING_BATCH_SIZE.labels(embedder=self.label).observe(len(texts))
+        try:
+            with observe(EMBEDDING_DURATION.labels(embedder=self.label)):
+                embeddings, usages = await self._embed(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                usage = usages[i] if i < len(usages) else None
+                future.set_result((embeddings[i], usage))
+
+    async def _embed(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Embed texts with the provider's batch API, or concurrently one by one."""
+        if len(texts) > 1 and hasattr(self.embedder, "async_get_embeddings_batch_and_usage"):
+            return await self.embedder.async_get_embeddings_batch_and_usage(texts)
+
+        results = await asyncio.gather(*(self._embed_one(text) for text in texts))
+        return [r[0] for r in results], [r[1] for r in results]
+
+    async def _embed_one(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        try:
+            return await self.embedder.async_get_embedding_and_usage(text)
+        except NotImplementedError:
+            return await asyncio.to_thread(self.embedder.get_embedding_and_usage, text)
+
+    def stats(self) -> dict:
+        """Get batching statistics."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def get_batcher(embedder: Embedder) -> EmbeddingBatcher:
+    """Get the shared batcher for an embedder's provider and model."""
+    key = f"{type(embedder).__name__}:{getattr(embedder, 'id', '')}:{embedder.dimensions}"
+    with _loop_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = EmbeddingBatcher(
+                embedder,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+                max_wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+            )
+            _batchers[key] = batcher
+        return batcher
+
+
+def get_batching_stats() -> Dict[str, dict]:
+    """Get statistics for all batchers, keyed by provider/model."""
+    return {key: batcher.stats() for key, batcher in _batchers.items()}
+
+
+@dataclass
+class BatchingEmbedder(Embedder):
+    """Embedder wrapper that routes every call through a shared EmbeddingBatcher."""
+
+    embedder: Optional[Embedder] = None
+    id: Optional[str] = None
+
+    def __post_init__(self):
+        if self.embedder is None:
+            raise ValueError("BatchingEmbedder requires an embedder to wrap")
+        self.id = getattr(self.embedder, "id", None)
+        self.dimensions = self.embedder.dimensions
+        # Let PgVector hand over whole document lists; they are re-batched here
+        self.enable_batch = True
+        self.batch_size = settings.EMBEDDING_BATCH_MAX_SIZE
+        self._batcher = get_batcher(self.embedder)
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self._batcher.submit(text).result()
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        return (await self.async_get_embedding_and_usage(text))[0]
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return await asyncio.wrap_future(self._batcher.submit(text))
+
+    async def async_get_embeddings_batch_and_usage(
+        self, texts: List[str]
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        results = await asyncio.gather(*(self.async_get_embedding_and_usage(text) for text in texts))
+        return [r[0] for r in results], [r[1] for r in results]
@@ -0,0 +1,63 @@
+"""
+Offline deterministic embedder using feature hashing.
+
+Maps word unigrams and bigrams into a fixed-size signed vector and
+L2-normalizes it. No model or network call is involved, so it is fast and
+reproducible: useful for load tests and CI, where it isolates database and
+pipeline costs from provider latency. Texts sharing words get similar
+vectors, so search still returns plausible results.
+"""
+
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from agno.knowledge.embedder.base import Embedder
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class HashingEmbedder(Embedder):
+    """Feature-hashing embedder (no external provider)."""
+
+    id: str = "feature-hashing"
+    dimensions: Optional[int] = 768
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            index = value % self.dimensions
+            sign = 1.0 if (value >> 63) & 1 else -1.0
+            vector[index] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            # Empty text: fixed unit vector so cosine distance stays defined
+            vector[0] = 1.0
+            return vector
+        return [v / norm for v in vector]
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self._embed(text), None
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self._embed(text), None
+
+    async def async_get_embeddings_batch_and_usage(
+        self, texts: List[str]
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        return [self._embed(t) for t in texts], [None] * len(texts)
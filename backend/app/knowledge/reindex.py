@@ -0,0 +1,580 @@
+"""
+Background reindex jobs.
+
+A reindex job re-embeds knowledge_embeddings rows with the current embedder,
+in place, and records the model and dimension on each row. A job can be
+limited to one knowledge base, and/or to stale rows: rows without a vector or
+whose embedding_model/embedding_dimensions differ from the job's.
+
+Rows are streamed with a server-side cursor in id order, embedded in batches
+of REINDEX_BATCH_SIZE with up to REINDEX_PARALLELISM batches in flight, and
+written back with one UPDATE per batch.
+
+A full reindex drops the vector index first and rebuilds it concurrently
+when the job ends (see vector_index).
+
+Progress and the last fully processed id are checkpointed in
+app.reindex_jobs after every batch, so a paused, cancelled or interrupted
+job resumes where it stopped. Pause and cancel are requested through the
+job row, so any worker can control a job running in another worker.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+from app.knowledge.vector_index import drop_vector_index, ensure_vector_index
+
+
+# A running job whose heartbeat is older than this is considered interrupted.
+# Compared with the database clock, which also writes the heartbeat.
+STALE_AFTER_SECONDS = 600
+
+JOB_COLUMNS = f"""
+    id, status, requested_action, provider, model, dimensions,
+    knowledge_base_id, stale_only, total_rows, processed_rows, failed_rows, last_id, error,
+    created_at, started_at, updated_at, finished_at,
+    COALESCE(updated_at < NOW() - make_interval(secs => {STALE_AFTER_SECONDS}), false) AS heartbeat_expired
+"""
+
+_engine = None
+
+# Runners active in this worker, keyed by job id
+_runners: Dict[str, "ReindexRunner"] = {}
+_runners_lock = threading.Lock()
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_instrumented_engine("reindex", settings.DATABASE_URL, pool_pre_ping=True)
+    return _engine
+
+
+def _job_to_dict(row) -> dict:
+    job = dict(row._mapping)
+    job["id"] = str(job["id"])
+    if job["knowledge_base_id"] is not None:
+        job["knowledge_base_id"] = str(job["knowledge_base_id"])
+    job["percent"] = (
+        round(100 * job["processed_rows"] / job["total_rows"], 1) if job["total_rows"] else 100.0
+    )
+    job["stalled"] = _is_stalled(job, job.pop("heartbeat_expired"))
+    return job
+
+
+def _is_stalled(job: dict, heartbeat_expired: bool) -> bool:
+    """Whether a 'running' job has no live runner (e.g. its worker restarted)."""
+    if job["status"] != "running" or job["id"] in _runners:
+        return False
+    return heartbeat_expired
+
+
+def _row_filter(job: dict) -> Tuple[str, dict]:
+    """SQL conditions and parameters selecting the rows a job re-embeds."""
+    conditions = ["content IS NOT NULL", "content != ''"]
+    params = {}
+
+    if job.get("knowledge_base_id"):
+        conditions.append("knowledge_base_id = CAST(:kb_id AS UUID)")
+        params["kb_id"] = job["knowledge_base_id"]
+
+    if job.get("stale_only"):
+        conditions.append(
+            "(embedding IS NULL"
+            " OR embedding_model IS DISTINCT FROM :model"
+            " OR embedding_dimensions IS DISTINCT FROM :dimensions)"
+        )
+        params["model"] = job["model"]
+        params["dimensions"] = job["dimensions"]
+
+    return " AND ".join(conditions), params
+
+
+def count_stale_rows(conn, model: str, dimensions: int) -> int:
+    """
+    Count rows that were not embedded with the given model and dimension.
+
+    The stale predicate is split into disjoint branches that are each a
+    range on idx_ke_embedding_model or idx_ke_unembedded, so the cost grows
+    with the number of stale rows, not with the table.
+    """
+    where, params = _row_filter({})
+    branches = [
+        "embedding IS NULL",
+        "embedding IS NOT NULL AND embedding_model IS NULL",
+        "embedding IS NOT NULL AND embedding_model < :model",
+        "embedding IS NOT NULL AND embedding_model > :model",
+        "embedding IS NOT NULL AND embedding_model = :model AND embedding_dimensions IS NULL",
+        "embedding IS NOT NULL AND embedding_model = :model AND embedding_dimensions < :dimensions",
+        "embedding IS NOT NULL AND embedding_model = :model AND embedding_dimensions > :dimensions",
+    ]
+    union = " UNION ALL ".join(
+        f"SELECT 1 FROM {settings.DB_APP_SCHEMA}.knowledge_embeddings WHERE {branch} AND {where}"
+        for branch in branches
+    )
+    return conn.execute(
+        text(f"SELECT COUNT(*) FROM ({union}) AS stale"),
+        {**params, "model": model, "dimensions": dimensions}
+    ).scalar() or 0
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """Get a reindex job and its progress."""
+    with _get_engine().connect() as conn:
+        row = conn.execute(
+            text(f"SELECT {JOB_COLUMNS} FROM {settings.DB_APP_SCHEMA}.reindex_jobs WHERE id = CAST(:id AS UUID)"),
+            {"id": job_id}
+        ).fetchone()
+    return _job_to_dict(row) if row else None
+
+
+def get_latest_job() -> Optional[dict]:
+    """Get the most recently created reindex job."""
+    with _get_engine().connect() as conn:
+        row = conn.execute(
+            text(f"""
+                SELECT {JOB_COLUMNS} FROM {settings.DB_APP_SCHEMA}.reindex_jobs
+                ORDER BY created_at DESC
+                LIMIT 1
+            """)
+        ).fetchone()
+    return _job_to_dict(row) if row else None
+
+
+def _get_active_job() -> Optional[dict]:
+    """Get the job that is running (and not stalled) or paused, if any."""
+    with _get_engine().connect() as conn:
+        rows = conn.execute(
+            text(f"""
+                SELECT {JOB_COLUMNS} FROM {settings.DB_APP_SCHEMA}.reindex_jobs
+                WHERE status IN ('running', 'paused')
+                ORDER BY created_at DESC
+            """)
+        ).fetchall()
+    for row in rows:
+        job = _job_to_dict(row)
+        if not job["stalled"]:
+            return job
+    return None
+
+
+def _fail_job(job_id: str, error: str) -> None:
+    """Mark a job that never got a runner as failed."""
+    with _get_engine().connect() as conn:
+        conn.execute(
+            text(f"""
+                UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                SET status = 'failed', requested_action = NULL, error = :error,
+                    updated_at = NOW(), finished_at = NOW()
+                WHERE id = CAST(:id AS UUID)
+            """),
+            {"id": job_id, "error": error}
+        )
+        conn.commit()
+    print(f"[ERROR] Reindex job {job_id} failed: {error}")
+
+
+def start_job(
+    provider: str,
+    model: str,
+    dimensions: int,
+    knowledge_base_id: Optional[str] = None,
+    stale_only: bool = False,
+) -> dict:
+    """
+    Start a reindex job with the given embedding configuration.
+
+    If the stored dimension differs, the embedding column is resized first
+    (existing vectors are cleared, rows are kept). The stored embedding_config
+    is updated before the job starts, so new uploads use the same settings.
+
+    Args:
+        knowledge_base_id: Only reindex this knowledge base.
+        stale_only: Only reindex rows not embedded with this model/dimension.
+
+    Raises:
+        ValueError: If another reindex job is running or paused, or if a
+            dimension change is requested for a single knowledge base.
+
+    At most one job can be running or paused (a partial unique index), so
+    concurrent starts from several workers cannot both succeed.
+    """
+    active = _get_active_job()
+    if active:
+        raise ValueError(f"Reindex job {active['id']} is already {active['status']}")
+
+    job = {
+        "model": model,
+        "dimensions": dimensions,
+        "knowledge_base_id": knowledge_base_id,
+        "stale_only": stale_only,
+    }
+    where, params = _row_filter(job)
+
+    with _get_engine().connect() as conn:
+        stored_config = conn.execute(
+            text(f"SELECT dimensions FROM {settings.DB_APP_SCHEMA}.embedding_config WHERE id = 1")
+        ).fetchone()
+        stored_dimensions = stored_config[0] if stored_config else None
+
+        if stored_dimensions != dimensions:
+            if knowledge_base_id:
+                # Resizing the column clears every knowledge base's vectors
+                raise ValueError(
+                    f"Embedding dimension changed ({stored_dimensions} -> {dimensions}); "
+                    "a full reindex is required"
+                )
+            conn.execute(
+                text(f"SELECT {settings.DB_APP_SCHEMA}.update_embedding_dimension(:dimensions)"),
+                {"dimensions": dimensions}
+            )
+
+        conn.execute(
+            text(f"""
+                INSERT INTO {settings.DB_APP_SCHEMA}.embedding_config (id, provider, model, dimensions)
+                VALUES (1, :provider, :model, :dimensions)
+                ON CONFLICT (id) DO UPDATE SET
+                    provider = :provider,
+                    model = :model,
+                    dimensions = :dimensions,
+                    updated_at = NOW()
+            """),
+            {"provider": provider, "model": model, "dimensions": dimensions}
+        )
+
+        total_rows = conn.execute(
+            text(f"SELECT COUNT(*) FROM {settings.DB_APP_SCHEMA}.knowledge_embeddings WHERE {where}"),
+            params
+        ).scalar() or 0
+
+        # Stalled jobs still hold the single active slot (idx_reindex_jobs_single_active)
+        conn.execute(
+            text(f"""
+                UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                SET status = 'cancelled', requested_action = NULL,
+                    error = 'Superseded by a newer reindex job',
+                    updated_at = NOW(), finished_at = NOW()
+                WHERE status = 'running'
+                  AND updated_at < NOW() - make_interval(secs => :stale_after)
+                  AND NOT (CAST(id AS TEXT) = ANY(CAST(:live_ids AS TEXT[])))
+            """),
+            {"stale_after": STALE_AFTER_SECONDS, "live_ids": list(_runners)}
+        )
+
+        status = "running" if total_rows else "completed"
+        try:
+            job_id = conn.execute(
+                text(f"""
+                    INSERT INTO {settings.DB_APP_SCHEMA}.reindex_jobs
+                        (status, provider, model, dimensions, knowledge_base_id, stale_only,
+                         total_rows, finished_at)
+                    VALUES (:status, :provider, :model, :dimensions, CAST(:kb_id AS UUID), :stale_only,
+                            :total_rows, CASE WHEN :status = 'completed' THEN NOW() END)
+                    RETURNING id
+                """),
+                {
+                    "status": status,
+                    "provider": provider,
+                    "model": model,
+                    "dimensions": dimensions,
+                    "kb_id": knowledge_base_id,
+                    "stale_only": stale_only,
+                    "total_rows": total_rows,
+                }
+            ).scalar()
+        except IntegrityError:
+            # Another worker started a job since the check above
+            conn.rollback()
+            raise ValueError("Another reindex job is already running or paused")
+        conn.commit()
+
+    if not total_rows:
+        # Nothing to load; make sure a resized column gets its index back
+        ensure_vector_index()
+    elif not knowledge_base_id and not stale_only:
+        # Full bulk load: rebuilt concurrently once the job finishes
+        try:
+            drop_vector_index()
+        except Exception as e:
+            # The job row is committed; don't leave it holding the active slot
+            _fail_job(str(job_id), f"Dropping the vector index failed: {e}")
+            raise
+
+    job = get_job(str(job_id))
+    if total_rows:
+        _start_runner(job)
+    return job
+
+
+def resume_job(job_id: str) -> Optional[dict]:
+    """
+    Resume a paused or interrupted job from its checkpoint.
+
+    Returns None if the job does not exist.
+
+    Raises:
+        ValueError: If the job cannot be resumed.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return None
+    if job["status"] != "paused" and not job["stalled"]:
+        raise ValueError(f"Reindex job is {job['status']} and cannot be resumed")
+
+    with _get_engine().connect() as conn:
+        updated = conn.execute(
+            text(f"""
+                UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                SET status = 'running', requested_action = NULL, error = NULL,
+                    started_at = NOW(), updated_at = NOW()
+                WHERE id = CAST(:id AS UUID) AND status = :status AND updated_at = :updated_at
+            """),
+            {"id": job_id, "status": job["status"], "updated_at": job["updated_at"]}
+        ).rowcount
+        conn.commit()
+    if not updated:
+        raise ValueError("Reindex job was modified concurrently, try again")
+
+    _start_runner(job)
+    return get_job(job_id)
+
+
+def request_action(job_id: str, action: str) -> Optional[dict]:
+    """
+    Ask a job to pause or cancel.
+
+    A running job stops after its in-flight batches and checkpoints; a paused
+    or interrupted job is cancelled immediately. Returns None if the job does
+    not exist.
+
+    Raises:
+        ValueError: If the job is not in a state that accepts the action.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return None
+
+    with _get_engine().connect() as conn:
+        if job["status"] == "running" and not job["stalled"]:
+            conn.execute(
+                text(f"""
+                    UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                    SET requested_action = :action
+                    WHERE id = CAST(:id AS UUID) AND status = 'running'
+                """),
+                {"id": job_id, "action": action}
+            )
+        elif action == "cancel" and job["status"] in ("running", "paused"):
+            conn.execute(
+                text(f"""
+                    UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                    SET status = 'cancelled', requested_action = NULL,
+                        updated_at = NOW(), finished_at = NOW()
+                    WHERE id = CAST(:id AS UUID)
+                """),
+                {"id": job_id}
+            )
+        else:
+            raise ValueError(f"Cannot {action} a reindex job that is {job['status']}")
+        conn.commit()
+
+    return get_job(job_id)
+
+
+def _start_runner(job: dict) -> None:
+    runner = ReindexRunner(
+        job,
+        batch_size=settings.REINDEX_BATCH_SIZE,
+        parallelism=settings.REINDEX_PARALLELISM,
+    )
+    with _runners_lock:
+        _runners[job["id"]] = runner
+    runner.start()
+
+
+class ReindexRunner:
+    """
+    Runs one reindex job on a background thread with its own event loop.
+
+    Batches may complete out of order, so the checkpoint only advances over
+    the contiguous prefix of completed batches: every row up to last_id has
+    been processed, and a resumed job restarts right after it.
+    """
+
+    def __init__(self, job: dict, batch_size: int, parallelism: int):
+        self.job = job
+        self.job_id = job["id"]
+        self.last_id = job["last_id"]
+        self.batch_size = max(1, batch_size)
+        self.parallelism = max(1, parallelism)
+
+        self._batches: List[dict] = []  # In-flight batches, in id order
+        self._lock = threading.Lock()
+        self._stop_action: Optional[str] = None
+
+    def start(self) -> None:
+        thread = threading.Thread(target=self._main, name=f"reindex-{self.job_id[:8]}", daemon=True)
+        thread.start()
+
+    def _main(self) -> None:
+        try:
+            asyncio.run(self._run())
+        except Exception as e:
+            print(f"[ERROR] Reindex job {self.job_id} failed: {e}")
+            self._build_index()
+            self._finish("failed", error=str(e))
+        finally:
+            with _runners_lock:
+                _runners.pop(self.job_id, None)
+
+    async def _run(self) -> None:
+        from app.config.embedders import get_embedder
+
+        embedder, embedder_name, _ = get_embedder()
+        if embedder is None:
+            raise RuntimeError(f"Cannot create embedder: {embedder_name}")
+
+        semaphore = asyncio.Semaphore(self.parallelism)
+        tasks = set()
+
+        where, params = _row_filter(self.job)
+
+        with _get_engine().connect() as conn:
+            # Server-side cursor: rows are fetched batch by batch, never all at once
+            result = conn.execution_options(stream_results=True, max_row_buffer=self.batch_size).execute(
+                text(f"""
+                    SELECT id, content FROM {settings.DB_APP_SCHEMA}.knowledge_embeddings
+                    WHERE {where} AND id > :last_id
+                    ORDER BY id
+                """),
+                {**params, "last_id": self.last_id or ""}
+            )
+
+            while self._stop_action is None:
+                await semaphore.acquire()
+                rows = await asyncio.to_thread(result.fetchmany, self.batch_size)
+                if not rows:
+                    semaphore.release()
+                    break
+
+                batch = {"last_id": rows[-1][0], "done": False, "processed": 0, "failed": 0}
+                with self._lock:
+                    self._batches.append(batch)
+
+                task = asyncio.create_task(self._process_batch(embedder, rows, batch))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: semaphore.release())
+
+            if tasks:
+                await asyncio.gather(*tasks)
+            result.close()
+
+        # A paused job keeps deferring the index until it is resumed
+        if self._stop_action == "pause":
+            self._finish("paused")
+            return
+
+        await asyncio.to_thread(self._build_index)
+        self._finish("cancelled" if self._stop_action == "cancel" else "completed")
+
+    def _build_index(self) -> None:
+        """Build the vector index if the load deferred it, then ANALYZE."""
+        try:
+            ensure_vector_index()
+        except Exception as e:
+            print(f"[WARNING] Reindex job {self.job_id}: vector index build failed: {e}")
+
+    async def _process_batch(self, embedder, rows, batch: dict) -> None:
+        ids = [row[0] for row in rows]
+        texts = [row[1] for row in rows]
+
+        try:
+            embeddings = await self._embed(embedder, texts)
+            params = [
+                {
+                    "id": row_id,
+                    "embedding": json.dumps(embedding),
+                    "model": self.job["model"],
+                    "dimensions": self.job["dimensions"],
+                }
+                for row_id, embedding in zip(ids, embeddings) if embedding
+            ]
+            if params:
+                await asyncio.to_thread(self._write_embeddings, params)
+            batch["processed"] = len(params)
+            batch["failed"] = len(ids) - len(params)
+        except Exception as e:
+            print(f"[WARNING] Reindex job {self.job_id}: batch ending at {batch['last_id']} failed: {e}")
+            batch["failed"] = len(ids)
+
+        batch["done"] = True
+        await asyncio.to_thread(self._checkpoint)
+
+    async def _embed(self, embedder, texts: List[str]) -> List[List[float]]:
+        if hasattr(embedder, "async_get_embeddings_batch_and_usage"):
+            embeddings, _ = await embedder.async_get_embeddings_batch_and_usage(texts)
+            return embeddings
+        return await asyncio.gather(*(embedder.async_get_embedding(t) for t in texts))
+
+    def _write_embeddings(self, params: List[dict]) -> None:
+        with _get_engine().connect() as conn:
+            conn.execute(
+                text(f"""
+                    UPDATE {settings.DB_APP_SCHEMA}.knowledge_embeddings
+                    SET embedding = CAST(:embedding AS vector),
+                        embedding_model = :model,
+                        embedding_dimensions = :dimensions
+                    WHERE id = :id
+                """),
+                params
+            )
+            conn.commit()
+
+    def _checkpoint(self) -> None:
+        """Persist progress over completed batches and pick up pause/cancel requests."""
+        with self._lock:
+            processed = failed = 0
+            while self._batches and self._batches[0]["done"]:
+                batch = self._batches.pop(0)
+                processed += batch["processed"]
+                failed += batch["failed"]
+                self.last_id = batch["last_id"]
+
+            with _get_engine().connect() as conn:
+                action = conn.execute(
+                    text(f"""
+                        UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                        SET processed_rows = processed_rows + :processed,
+                            failed_rows = failed_rows + :failed,
+                            last_id = :last_id,
+                            updated_at = NOW()
+                        WHERE id = CAST(:id AS UUID)
+                        RETURNING requested_action
+                    """),
+                    {"id": self.job_id, "processed": processed, "failed": failed, "last_id": self.last_id}
+                ).scalar()
+                conn.commit()
+
+            if action and self._stop_action is None:
+                self._stop_action = action
+
+    def _finish(self, status: str, error: Optional[str] = None) -> None:
+        with _get_engine().connect() as conn:
+            conn.execute(
+                text(f"""
+                    UPDATE {settings.DB_APP_SCHEMA}.reindex_jobs
+                    SET status = :status, requested_action = NULL, error = :error,
+                        updated_at = NOW(),
+                        finished_at = CASE WHEN :status = 'paused' THEN NULL ELSE NOW() END
+                    WHERE id = CAST(:id AS UUID)
+                """),
+                {"id": self.job_id, "status": status, "error": error}
+            )
+            conn.commit()
+        print(f"[INFO] Reindex job {self.job_id} {status} (checkpoint: {self.last_id})")
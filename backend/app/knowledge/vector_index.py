@@ -0,0 +1,246 @@
+"""
+Vector index management for knowledge_embeddings.
+
+An ivfflat index trains its centroids on the rows present when it is built,
+and every insert into an indexed table also updates the index. Bulk loads
+(full reindex) therefore run without the index, which is built afterwards
+with CREATE INDEX CONCURRENTLY so reads are never blocked, followed by
+ANALYZE so the planner sees the new data.
+
+Tables below VECTOR_INDEX_MIN_ROWS are searched exactly, without an index.
+Each build records the row count it trained on as the index comment; a
+background maintainer builds the index once the table is large enough and
+retrains it when the table has outgrown its training set.
+"""
+
+import asyncio
+import math
+from typing import Optional
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+INDEX_NAME = "idx_ke_embedding"
+TABLE_NAME = "knowledge_embeddings"
+
+# pgvector ivfflat indexes support at most this many dimensions
+MAX_INDEX_DIMENSIONS = 2000
+
+# Retrain once the embedded rows exceed this multiple of the training rows
+REBUILD_GROWTH_FACTOR = 2
+
+# Arbitrary key for pg_try_advisory_lock (one maintainer at a time)
+MAINTENANCE_LOCK_KEY = 7_040_001
+
+_engine = None
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        # CONCURRENTLY statements cannot run inside a transaction block
+        _engine = create_instrumented_engine(
+            "vector_index", settings.DATABASE_URL, pool_pre_ping=True, isolation_level="AUTOCOMMIT"
+        )
+    return _engine
+
+
+def _ivfflat_lists(rows: int) -> int:
+    """Number of ivfflat lists: rows / 1000 up to 1M rows, sqrt(rows) above."""
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(1, rows // 1000)
+
+
+def _trained_rows(comment: Optional[str]) -> Optional[int]:
+    """Rows the index was trained on, from its 'trained_rows=N' comment."""
+    if comment and comment.startswith("trained_rows="):
+        try:
+            return int(comment.split("=", 1)[1])
+        except ValueError:
+            pass
+    return None
+
+
+def get_vector_index_status() -> dict:
+    """
+    Get the vector index state, table size estimates and column dimension.
+
+    needs_build is set when the table has at least VECTOR_INDEX_MIN_ROWS
+    embedded rows and the index is missing, invalid, of unknown training
+    size, or trained on fewer than 1/REBUILD_GROWTH_FACTOR of those rows.
+    """
+    schema = settings.DB_APP_SCHEMA
+    with _get_engine().connect() as conn:
+        index = conn.execute(
+            text("""
+                SELECT i.indisvalid, pg_get_indexdef(i.indexrelid), pg_relation_size(i.indexrelid),
+                       obj_description(i.indexrelid, 'pg_class')
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema AND c.relname = :index
+            """),
+            {"schema": schema, "index": INDEX_NAME}
+        ).fetchone()
+
+        table = conn.execute(
+            text("""
+                SELECT c.reltuples::bigint, a.atttypmod
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_attribute a ON a.attrelid = c.oid AND a.attname = 'embedding'
+                WHERE n.nspname = :schema AND c.relname = :table
+            """),
+            {"schema": schema, "table": TABLE_NAME}
+        ).fetchone()
+
+        # Served by the partial idx_ke_unembedded index
+        unembedded = conn.execute(
+            text(f"SELECT COUNT(*) FROM {schema}.{TABLE_NAME} WHERE embedding IS NULL")
+        ).scalar() or 0
+
+    estimated_rows = max(table[0], 0) if table else 0
+    embedded_rows = max(estimated_rows - unembedded, 0)
+    dimensions = table[1] if table and table[1] > 0 else None
+    trained_rows = _trained_rows(index[3]) if index else None
+
+    outgrown = (
+        index is None
+        or not index[0]
+        or trained_rows is None
+        or embedded_rows > REBUILD_GROWTH_FACTOR * trained_rows
+    )
+    return {
+        "exists": index is not None,
+        "valid": bool(index[0]) if index else False,
+        "definition": index[1] if index else None,
+        "size_bytes": index[2] if index else 0,
+        "estimated_rows": estimated_rows,
+        "embedded_rows": embedded_rows,
+        "trained_rows": trained_rows,
+        "dimensions": dimensions,
+        "needs_build": (
+            outgrown
+            and embedded_rows >= settings.VECTOR_INDEX_MIN_ROWS
+            and (dimensions is None or dimensions <= MAX_INDEX_DIMENSIONS)
+        ),
+    }
+
+
+def drop_vector_index() -> None:
+    """Drop the vector index without blocking reads (before a bulk load)."""
+    with _get_engine().connect() as conn:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {settings.DB_APP_SCHEMA}.{INDEX_NAME}"))
+    print("[INFO] Vector index dropped for bulk load")
+
+
+def ensure_vector_index(rebuild: bool = False) -> dict:
+    """
+    Build the vector index concurrently if it is missing or invalid, then ANALYZE.
+
+    With rebuild=True an existing index is replaced: the new one is built
+    alongside it and swapped in, so searches keep an index throughout. Use it
+    after bulk ingest to retrain ivfflat centroids on the loaded data.
+
+    With fewer than VECTOR_INDEX_MIN_ROWS embedded rows no index is built
+    (centroids trained on too little data hurt recall and are never
+    retrained by inserts) and any existing one is dropped; searches scan
+    exactly until the maintainer builds it.
+
+    Returns:
+        The index status after the build.
+    """
+    schema = settings.DB_APP_SCHEMA
+    status = get_vector_index_status()
+    dimensions: Optional[int] = status["dimensions"]
+
+    too_large = dimensions is not None and dimensions > MAX_INDEX_DIMENSIONS
+    if too_large or (status["exists"] and status["valid"] and not rebuild):
+        if too_large:
+            print(f"[WARNING] Vector index skipped: {dimensions} dimensions exceeds {MAX_INDEX_DIMENSIONS}")
+        with _get_engine().connect() as conn:
+            conn.execute(text(f"ANALYZE {schema}.{TABLE_NAME}"))
+        return get_vector_index_status()
+
+    with _get_engine().connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT COUNT(*) FROM {schema}.{TABLE_NAME} WHERE embedding IS NOT NULL")
+        ).scalar() or 0
+        if rows < settings.VECTOR_INDEX_MIN_ROWS:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{INDEX_NAME}"))
+            conn.execute(text(f"ANALYZE {schema}.{TABLE_NAME}"))
+            print(
+                f"[INFO] Vector index skipped: {rows} rows "
+                f"(built from {settings.VECTOR_INDEX_MIN_ROWS})"
+            )
+            return get_vector_index_status()
+
+        lists = _ivfflat_lists(rows)
+
+        if settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM:
+            conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'"))
+
+        # A failed concurrent build leaves an invalid index behind
+        target = f"{INDEX_NAME}_new" if status["exists"] and status["valid"] else INDEX_NAME
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{INDEX_NAME}_new"))
+        if target == INDEX_NAME:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{INDEX_NAME}"))
+
+        conn.execute(
+            text(f"""
+                CREATE INDEX CONCURRENTLY {target} ON {schema}.{TABLE_NAME}
+                USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists})
+            """)
+        )
+
+        if target != INDEX_NAME:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{INDEX_NAME}"))
+            conn.execute(text(f"ALTER INDEX {schema}.{target} RENAME TO {INDEX_NAME}"))
+
+        conn.execute(text(f"COMMENT ON INDEX {schema}.{INDEX_NAME} IS 'trained_rows={rows}'"))
+        conn.execute(text(f"ANALYZE {schema}.{TABLE_NAME}"))
+
+    print(f"[INFO] Vector index built over {rows} rows (lists = {lists})")
+    return get_vector_index_status()
+
+
+def maintain_vector_index() -> bool:
+    """
+    Build or retrain the index if needs_build is set. Returns True if it did.
+
+    Skipped while a reindex job is running or paused (the job builds the
+    index itself when it finishes) and while another worker is maintaining.
+    """
+    schema = settings.DB_APP_SCHEMA
+    with _get_engine().connect() as conn:
+        locked = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        ).scalar()
+        if not locked:
+            return False
+        try:
+            active_job = conn.execute(
+                text(f"SELECT 1 FROM {schema}.reindex_jobs WHERE status IN ('running', 'paused') LIMIT 1")
+            ).fetchone()
+            if active_job:
+                return False
+
+            status = get_vector_index_status()
+            if not status["needs_build"]:
+                return False
+            ensure_vector_index(rebuild=status["exists"] and status["valid"])
+            return True
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+
+
+async def run_vector_index_maintainer() -> None:
+    """Check the index every VECTOR_INDEX_CHECK_INTERVAL seconds (until cancelled)."""
+    while True:
+        await asyncio.sleep(settings.VECTOR_INDEX_CHECK_INTERVAL)
+        try:
+            await asyncio.to_thread(maintain_vector_index)
+        except Exception as e:
+            print(f"[WARNING] Vector index maintenance failed: {e}")
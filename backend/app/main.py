@@ -1,12 +1,16 @@
 """
 Main FastAPI application with AG-UI integration and RAG support.
 """
-from fastapi import Request
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from agno.os import AgentOS
 from agno.os.interfaces.agui import AGUI
 from app.agents.assistant import create_assistant_agent
 from app.config.settings import settings
+from app.utils.metrics import HTTP_REQUEST_DURATION, render_metrics, route_label
 
 
 class UserContextMiddleware(BaseHTTPMiddleware):
@@ -27,6 +31,81 @@ class UserContextMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Middleware recording request latency by route template."""
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                method=request.method,
+                route=route_label(request.scope),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
+
+
+def warm_up():
+    """Open the shared knowledge base's DB connection before the first request."""
+    if not use_knowledge:
+        return
+    try:
+        knowledge.vector_db.table_exists()
+        print("[INFO] Knowledge base connection warmed up")
+    except Exception as e:
+        print(f"[WARNING] Knowledge base warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    """Application lifespan: warm up shared clients, release them on shutdown."""
+    await asyncio.to_thread(warm_up)
+
+    from app.utils.stats_rollup import run_stats_refresher
+    stats_refresher = asyncio.create_task(run_stats_refresher())
+
+    from app.utils.readiness import run_readiness_prober
+    readiness_prober = asyncio.create_task(run_readiness_prober(use_knowledge))
+
+    from app.knowledge.vector_index import run_vector_index_maintainer
+    vector_index_maintainer = asyncio.create_task(run_vector_index_maintainer())
+
+    from app.utils.aux_tasks import start_aux_workers, stop_aux_workers
+    start_aux_workers()
+
+    from app.utils.touch_buffer import flush_touches, run_touch_flusher
+    touch_flusher = asyncio.create_task(run_touch_flusher())
+
+    yield
+
+    stats_refresher.cancel()
+    readiness_prober.cancel()
+    vector_index_maintainer.cancel()
+    stop_aux_workers()
+
+    # Write touches still buffered
+    touch_flusher.cancel()
+    try:
+        await asyncio.to_thread(flush_touches)
+    except Exception as e:
+        print(f"[WARNING] Final conversation touch flush failed: {e}")
+
+    # Write back embedding cache hits still buffered
+    from app.knowledge.embedding_cache import get_embedding_cache_store
+    await asyncio.to_thread(get_embedding_cache_store().flush_hits)
+
+    if use_web_search:
+        from app.tools.web_search import stop_background_loop
+        stop_background_loop()
+
+    from app.utils.http import close_http_client
+    await close_http_client()
+
+
 # Check if knowledge/RAG should be enabled
 use_knowledge = False
 embedding_provider = None
@@ -41,7 +120,7 @@ try:
         # embedding_provider contains error message when embedder is None
         print(f"[ERROR] RAG disabled: {embedding_provider}")
     else:
-        knowledge = get_knowledge_base(embedder=embedder)
+        knowledge = get_knowledge_base()
         use_knowledge = True
         print(f"[INFO] RAG enabled with {embedding_provider} embeddings ({dimensions} dimensions)")
 
@@ -52,7 +131,7 @@ except Exception as e:
 use_web_search = False
 if settings.WEB_SEARCH_ENABLED:
     use_web_search = True
-    print(f"[INFO] Web search enabled (DuckDuckGo)")
+    print(f"[INFO] Web search enabled ({settings.WEB_SEARCH_BACKEND})")
 
 # Create the assistant agent with available tools
 assistant = create_assistant_agent(
@@ -64,13 +143,15 @@ assistant = create_assistant_agent(
 agent_os = AgentOS(
     agents=[assistant],
     interfaces=[AGUI(agent=assistant)],
+    lifespan=lifespan,
 )
 
 # Get the FastAPI app
 app = agent_os.get_app()
 
-# Add user context middleware
+# Add user context and metrics middleware
 app.add_middleware(UserContextMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Add knowledge API routes
 from app.api.knowledge import router as documents_router
@@ -105,6 +186,24 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: cached dependency probe results (503 until ready)."""
+    from fastapi.responses import JSONResponse
+    from app.utils.readiness import get_readiness
+
+    readiness = get_readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+# agno's AgentOS already serves its own GET /metrics
+@app.get("/prometheus", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     agent_os.serve(
         app="app.main:app",
@@ -6,6 +6,7 @@ from typing import List, Optional
 from contextvars import ContextVar
 from sqlalchemy import create_engine, text
 from app.config.settings import settings
+from app.utils.metrics import timed_tool
 
 # Context variables for user info (set per request)
 current_user_id: ContextVar[str] = ContextVar('current_user_id', default='')
@@ -74,6 +75,7 @@ def get_accessible_kb_ids(user_id: str, user_groups: List[str]) -> List[str]:
     return accessible_kb_ids
 
 
+@timed_tool
 def search_knowledge_base(query: str) -> str:
     """
     Search the knowledge base for information relevant to the query.
@@ -0,0 +1,116 @@
+"""
+Search backends for the web search tool.
+
+A backend turns a query into a ranked list of result URLs. DuckDuckGo's HTML
+interface is the default; WEB_SEARCH_BACKEND_URL can point it at any
+DuckDuckGo-HTML-compatible endpoint (e.g. the local benchmark fixture server).
+"""
+import asyncio
+import re
+from typing import Dict, List
+from urllib.parse import unquote
+from bs4 import BeautifulSoup
+from app.config.settings import settings
+from app.utils.http import get_http_client
+
+
+class SearchBackend:
+    """Base class for search backends."""
+
+    name = "base"
+
+    async def search(self, query: str, num_results: int, headers: Dict[str, str]) -> List[Dict[str, str]]:
+        """
+        Search for a query.
+
+        Args:
+            query: Search query
+            num_results: Maximum number of results to return
+            headers: HTTP headers to send with the request
+
+        Returns:
+            List of dicts with 'url', 'title', 'snippet', in rank order
+        """
+        raise NotImplementedError
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """Search using the DuckDuckGo HTML interface."""
+
+    name = "duckduckgo"
+
+    def __init__(self, base_url: str = "https://html.duckduckgo.com/html/"):
+        self.base_url = base_url
+
+    async def search(self, query: str, num_results: int, headers: Dict[str, str]) -> List[Dict[str, str]]:
+        client = get_http_client()
+        response = await client.get(
+            self.base_url,
+            params={"q": query},
+            headers=headers,
+            timeout=settings.WEB_SEARCH_TIMEOUT,
+            follow_redirects=True,
+        )
+        response.raise_for_status()
+
+        # BeautifulSoup parsing is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(parse_duckduckgo_html, response.text, num_results)
+
+
+def parse_duckduckgo_html(html: str, num_results: int) -> List[Dict[str, str]]:
+    """Extract result URLs, titles and snippets from a DuckDuckGo HTML page."""
+    soup = BeautifulSoup(html, 'lxml')
+    results = []
+
+    for result in soup.select('.result'):
+        if len(results) >= num_results:
+            break
+
+        # Get title and URL
+        title_elem = result.select_one('.result__title a')
+        if not title_elem:
+            continue
+
+        # DuckDuckGo uses redirect URLs, extract actual URL
+        href = title_elem.get('href', '')
+        url_match = re.search(r'uddg=([^&]+)', href)
+        if url_match:
+            url = unquote(url_match.group(1))
+        else:
+            url = href
+
+        # Skip non-http URLs
+        if not url.startswith('http'):
+            continue
+
+        title = title_elem.get_text(strip=True)
+
+        # Get snippet
+        snippet_elem = result.select_one('.result__snippet')
+        snippet = snippet_elem.get_text(strip=True) if snippet_elem else ''
+
+        results.append({
+            'url': url,
+            'title': title,
+            'snippet': snippet,
+        })
+
+    return results
+
+
+def get_search_backend() -> SearchBackend:
+    """
+    Get the search backend based on configuration.
+
+    Raises:
+        ValueError: If WEB_SEARCH_BACKEND is unknown.
+    """
+    backend = settings.WEB_SEARCH_BACKEND.lower()
+
+    if backend == "duckduckgo":
+        if settings.WEB_SEARCH_BACKEND_URL:
+            return DuckDuckGoBackend(base_url=settings.WEB_SEARCH_BACKEND_URL)
+        return DuckDuckGoBackend()
+
+    else:
+        raise ValueError(f"Unknown web search backend: {backend}")
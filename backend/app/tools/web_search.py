@@ -1,16 +1,21 @@
 """
-Web search tool using DuckDuckGo HTML interface.
+Web search tool using DuckDuckGo HTML interface (see search_backends).
 Fallback for providers without native web search (Ollama, LM Studio).
 """
 import asyncio
+import concurrent.futures
 import random
-import re
-from typing import List, Dict
-from urllib.parse import quote_plus, urljoin
+import threading
+import time
+from typing import Any, List, Dict, Optional
+from urllib.parse import urlparse
 import httpx
-from bs4 import BeautifulSoup
 from app.extractors.web import extract_web_content
 from app.config.settings import settings
+from app.utils.http import get_http_client, close_http_client
+from app.utils.cache import TTLCache, PostgresCacheStore
+from app.utils.metrics import timed_tool
+from app.tools.search_backends import SearchBackend, get_search_backend
 
 
 # User agents for rotation
@@ -21,6 +26,23 @@ USER_AGENTS = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
 ]
 
+# Search backend, created on first use (see WEB_SEARCH_BACKEND)
+_search_backend: Optional[SearchBackend] = None
+
+# Next allowed request time per host (monotonic clock), for politeness delay
+_host_next_slot: Dict[str, float] = {}
+
+# Two-level cache: query -> search results, URL -> extracted page content
+_query_cache = TTLCache(settings.WEB_SEARCH_QUERY_CACHE_SIZE, settings.WEB_SEARCH_QUERY_CACHE_TTL)
+_page_cache = TTLCache(settings.WEB_SEARCH_PAGE_CACHE_SIZE, settings.WEB_SEARCH_PAGE_CACHE_TTL)
+
+# Optional shared level in Postgres (WEB_SEARCH_CACHE_BACKEND=postgres)
+_shared_query_cache: Optional[PostgresCacheStore] = None
+_shared_page_cache: Optional[PostgresCacheStore] = None
+if settings.WEB_SEARCH_CACHE_BACKEND.lower() == "postgres":
+    _shared_query_cache = PostgresCacheStore("web_search_query")
+    _shared_page_cache = PostgresCacheStore("web_search_page")
+
 
 def _get_headers() -> Dict[str, str]:
     """Get headers with random user agent."""
@@ -34,9 +56,52 @@ def _get_headers() -> Dict[str, str]:
     }
 
 
-async def _search_duckduckgo(query: str, num_results: int = 5) -> List[Dict[str, str]]:
+async def _cache_get(memory: TTLCache, shared: Optional[PostgresCacheStore], key: str) -> Optional[Any]:
+    """Look up a key in memory, then in the shared level (promoting hits to memory)."""
+    if not settings.WEB_SEARCH_CACHE_ENABLED:
+        return None
+
+    value = memory.get(key)
+    if value is None and shared is not None:
+        value = await asyncio.to_thread(shared.get, key)
+        if value is not None:
+            memory.set(key, value)
+    return value
+
+
+async def _cache_set(memory: TTLCache, shared: Optional[PostgresCacheStore], key: str, value: Any) -> None:
+    """Store a value in memory and in the shared level if configured."""
+    if not settings.WEB_SEARCH_CACHE_ENABLED:
+        return
+
+    memory.set(key, value)
+    if shared is not None:
+        await asyncio.to_thread(shared.set, key, value, memory.ttl)
+
+
+def get_web_search_cache_stats() -> Dict[str, Any]:
+    """Get hit-rate statistics for the web search caches."""
+    return {
+        "enabled": settings.WEB_SEARCH_CACHE_ENABLED,
+        "backend": settings.WEB_SEARCH_CACHE_BACKEND.lower(),
+        "query_cache": _query_cache.stats(),
+        "page_cache": _page_cache.stats(),
+        "shared_query_cache": _shared_query_cache.stats() if _shared_query_cache else None,
+        "shared_page_cache": _shared_page_cache.stats() if _shared_page_cache else None,
+    }
+
+
+def _get_search_backend() -> SearchBackend:
+    """Get the configured search backend (created once)."""
+    global _search_backend
+    if _search_backend is None:
+        _search_backend = get_search_backend()
+    return _search_backend
+
+
+async def _search_candidates(query: str, num_results: int = 5) -> List[Dict[str, str]]:
     """
-    Search DuckDuckGo HTML interface and return result URLs.
+    Search with the configured backend and return result URLs.
 
     Args:
         query: Search query
@@ -45,51 +110,40 @@ async def _search_duckduckgo(query: str, num_results: int = 5) -> List[Dict[str,
     Returns:
         List of dicts with 'url', 'title', 'snippet'
     """
-    search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
+    cache_key = f"{num_results}:{' '.join(query.lower().split())}"
+    cached = await _cache_get(_query_cache, _shared_query_cache, cache_key)
+    if cached is not None:
+        return [dict(r) for r in cached]
 
-    async with httpx.AsyncClient(timeout=settings.WEB_SEARCH_TIMEOUT, follow_redirects=True) as client:
-        response = await client.get(search_url, headers=_get_headers())
-        response.raise_for_status()
+    results = await _get_search_backend().search(query, num_results, _get_headers())
 
-    soup = BeautifulSoup(response.text, 'lxml')
-    results = []
+    # Empty pages are often rate limiting, do not cache them
+    if results:
+        await _cache_set(_query_cache, _shared_query_cache, cache_key, results)
 
-    for result in soup.select('.result'):
-        if len(results) >= num_results:
-            break
+    return [dict(r) for r in results]
 
-        # Get title and URL
-        title_elem = result.select_one('.result__title a')
-        if not title_elem:
-            continue
 
-        # DuckDuckGo uses redirect URLs, extract actual URL
-        href = title_elem.get('href', '')
-        # Extract actual URL from DuckDuckGo redirect
-        url_match = re.search(r'uddg=([^&]+)', href)
-        if url_match:
-            from urllib.parse import unquote
-            url = unquote(url_match.group(1))
-        else:
-            url = href
-
-        # Skip non-http URLs
-        if not url.startswith('http'):
-            continue
+async def _wait_for_host(url: str) -> None:
+    """
+    Enforce WEB_SEARCH_DELAY between requests to the same host.
 
-        title = title_elem.get_text(strip=True)
+    Requests to different hosts are not delayed. The slot is reserved before
+    sleeping so concurrent fetches to one host are spaced out in order.
+    """
+    host = urlparse(url).netloc.lower()
+    now = time.monotonic()
 
-        # Get snippet
-        snippet_elem = result.select_one('.result__snippet')
-        snippet = snippet_elem.get_text(strip=True) if snippet_elem else ''
+    # Drop stale entries so the table does not grow without bound
+    if len(_host_next_slot) > 1000:
+        for stale in [h for h, slot in _host_next_slot.items() if slot < now]:
+            del _host_next_slot[stale]
 
-        results.append({
-            'url': url,
-            'title': title,
-            'snippet': snippet,
-        })
+    slot = max(now, _host_next_slot.get(host, 0.0))
+    _host_next_slot[host] = slot + settings.WEB_SEARCH_DELAY
 
-    return results
+    if slot > now:
+        await asyncio.sleep(slot - now)
 
 
 async def _fetch_page_content(url: str, max_chars: int = 4000) -> Dict[str, str]:
@@ -103,6 +157,11 @@ async def _fetch_page_content(url: str, max_chars: int = 4000) -> Dict[str, str]
     Returns:
         Dict with 'url', 'title', 'content', 'error'
     """
+    cache_key = f"{max_chars}:{url}"
+    cached = await _cache_get(_page_cache, _shared_page_cache, cache_key)
+    if cached is not None:
+        return dict(cached)
+
     result = {
         'url': url,
         'title': '',
@@ -111,8 +170,17 @@ async def _fetch_page_content(url: str, max_chars: int = 4000) -> Dict[str, str]
     }
 
     try:
-        async with httpx.AsyncClient(timeout=settings.WEB_SEARCH_TIMEOUT, follow_redirects=True) as client:
-            response = await client.get(url, headers=_get_headers())
+        await _wait_for_host(url)
+
+        # Stream the body: check headers first, then read at most the byte budget
+        client = get_http_client()
+        async with client.stream(
+            'GET',
+            url,
+            headers=_get_headers(),
+            timeout=settings.WEB_SEARCH_TIMEOUT,
+            follow_redirects=True,
+        ) as response:
             response.raise_for_status()
 
             content_type = response.headers.get('content-type', '')
@@ -120,9 +188,22 @@ async def _fetch_page_content(url: str, max_chars: int = 4000) -> Dict[str, str]
                 result['error'] = f'Non-HTML content: {content_type}'
                 return result
 
-            text, metadata = extract_web_content(response.text, max_chars=max_chars)
-            result['title'] = metadata.get('title', '')
-            result['content'] = text
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= settings.WEB_SEARCH_MAX_PAGE_BYTES:
+                    del body[settings.WEB_SEARCH_MAX_PAGE_BYTES:]
+                    break
+
+            html = body.decode(response.encoding or 'utf-8', errors='replace')
+
+        # BeautifulSoup parsing is CPU-bound; keep it off the event loop
+        text, metadata = await asyncio.to_thread(extract_web_content, html, max_chars=max_chars)
+        result['title'] = metadata.get('title', '')
+        result['content'] = text
+
+        if text:
+            await _cache_set(_page_cache, _shared_page_cache, cache_key, dict(result))
 
     except httpx.TimeoutException:
         result['error'] = 'Timeout'
@@ -134,6 +215,70 @@ async def _fetch_page_content(url: str, max_chars: int = 4000) -> Dict[str, str]
     return result
 
 
+async def _fetch_first_pages(candidates: List[Dict[str, str]], wanted: int) -> List[Dict[str, str]]:
+    """
+    Race page fetches and keep the first `wanted` pages with usable content.
+
+    Fetches run concurrently (bounded by WEB_SEARCH_CONCURRENCY) and stop as
+    soon as enough pages have content or WEB_SEARCH_DEADLINE passes; the
+    remaining fetches are cancelled. If too few pages succeed, the best-ranked
+    leftover candidates are kept with their search snippet only.
+
+    Args:
+        candidates: Search results in rank order
+        wanted: Number of pages to return
+
+    Returns:
+        Pages in search rank order, with 'search_title' and 'search_snippet'
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.WEB_SEARCH_CONCURRENCY))
+
+    async def fetch(url: str) -> Dict[str, str]:
+        async with semaphore:
+            return await _fetch_page_content(url)
+
+    tasks = {asyncio.create_task(fetch(c['url'])): rank for rank, c in enumerate(candidates)}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.WEB_SEARCH_DEADLINE
+
+    good: Dict[int, Dict[str, str]] = {}
+    pending = set(tasks)
+    try:
+        while pending and len(good) < wanted:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result()['content']:
+                    good[tasks[task]] = task.result()
+    finally:
+        # Also runs if the caller is cancelled (timeout, client disconnect),
+        # so leftover fetches release their connections and semaphore slots
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    # Keep the best-ranked good pages, then fill up with snippet-only results
+    selected = sorted(good)[:wanted]
+    for rank in range(len(candidates)):
+        if len(selected) >= wanted:
+            break
+        if rank not in good and candidates[rank]['snippet']:
+            selected.append(rank)
+
+    pages = []
+    for rank in sorted(selected):
+        candidate = candidates[rank]
+        page = good.get(rank) or {'url': candidate['url'], 'title': '', 'content': '', 'error': 'No content'}
+        page['search_title'] = candidate['title']
+        page['search_snippet'] = candidate['snippet']
+        pages.append(page)
+
+    return pages
+
+
 async def _search_web_async(query: str) -> str:
     """
     Async implementation of web search.
@@ -144,22 +289,16 @@ async def _search_web_async(query: str) -> str:
     Returns:
         Formatted search results with citations
     """
-    # Get search results from DuckDuckGo
-    search_results = await _search_duckduckgo(query, num_results=settings.WEB_SEARCH_NUM_RESULTS)
+    # Over-request candidates so slow or empty sites can be skipped
+    wanted = settings.WEB_SEARCH_NUM_RESULTS
+    search_results = await _search_candidates(
+        query, num_results=wanted + settings.WEB_SEARCH_EXTRA_CANDIDATES
+    )
 
     if not search_results:
         return f"No search results found for: {query}"
 
-    # Fetch content from each page with delay between requests
-    pages = []
-    for i, result in enumerate(search_results):
-        if i > 0:
-            await asyncio.sleep(settings.WEB_SEARCH_DELAY)
-
-        page = await _fetch_page_content(result['url'])
-        page['search_title'] = result['title']
-        page['search_snippet'] = result['snippet']
-        pages.append(page)
+    pages = await _fetch_first_pages(search_results, wanted)
 
     # Format results
     formatted = []
@@ -183,7 +322,8 @@ async def _search_web_async(query: str) -> str:
     return header + "\n\n---\n\n".join(formatted)
 
 
-def search_web(query: str) -> str:
+@timed_tool
+async def search_web(query: str) -> str:
     """
     Search the web for current information using DuckDuckGo.
 
@@ -198,17 +338,53 @@ def search_web(query: str) -> str:
         Search results with content excerpts and source citations
     """
     try:
-        # Run async function in event loop
-        try:
-            loop = asyncio.get_running_loop()
-            # If we're already in an async context, create a task
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _search_web_async(query))
-                return future.result(timeout=settings.WEB_SEARCH_TIMEOUT + 10)
-        except RuntimeError:
-            # No running loop, we can use asyncio.run directly
-            return asyncio.run(_search_web_async(query))
-
+        return await _search_web_async(query)
     except Exception as e:
         return f"Web search failed: {str(e)}"
+
+
+# Long-lived loop for synchronous callers (see search_web_sync)
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get (or start) the background event loop used by search_web_sync."""
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="web-search-loop", daemon=True)
+            thread.start()
+            _background_loop = loop
+        return _background_loop
+
+
+def search_web_sync(query: str) -> str:
+    """
+    Synchronous variant of search_web for callers without an event loop.
+
+    Runs on a shared background loop, so its HTTP connections are reused
+    across calls instead of creating a thread and loop per invocation.
+    """
+    future = asyncio.run_coroutine_threadsafe(search_web(query), _get_background_loop())
+    try:
+        return future.result(timeout=settings.WEB_SEARCH_TIMEOUT + settings.WEB_SEARCH_DEADLINE)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        return "Web search failed: timed out"
+
+
+def stop_background_loop() -> None:
+    """Close the background loop's HTTP client and stop the loop (on shutdown)."""
+    global _background_loop
+    with _background_lock:
+        loop, _background_loop = _background_loop, None
+    if loop is None or loop.is_closed():
+        return
+
+    try:
+        asyncio.run_coroutine_threadsafe(close_http_client(loop), loop).result(timeout=5)
+    except Exception as e:
+        print(f"[WARNING] Could not close web search HTTP client: {e}")
+    loop.call_soon_threadsafe(loop.stop)
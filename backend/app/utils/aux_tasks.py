@@ -0,0 +1,66 @@
+"""
+Queue for auxiliary model work (conversation titles and other housekeeping).
+
+Tasks are queued and run by AUX_TASK_CONCURRENCY worker tasks started in the
+application lifespan, so bursts of new conversations are smoothed out
+instead of fanning out to the provider all at once.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+from app.config.settings import settings
+
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+
+
+async def _worker() -> None:
+    while True:
+        func, future = await _queue.get()
+        try:
+            # Skip tasks whose caller already gave up (timeout or disconnect)
+            if not future.done():
+                result = await func()
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            _queue.task_done()
+
+
+def start_aux_workers() -> None:
+    """Start the queue and its workers (called from the application lifespan)."""
+    global _queue
+    _queue = asyncio.Queue(maxsize=settings.AUX_TASK_QUEUE_SIZE)
+    for _ in range(max(1, settings.AUX_TASK_CONCURRENCY)):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+def stop_aux_workers() -> None:
+    """Cancel the workers; queued tasks are dropped."""
+    global _queue
+    for worker in _workers:
+        worker.cancel()
+    _workers.clear()
+    _queue = None
+
+
+async def run_aux_task(func: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Queue an auxiliary task and wait for its result.
+
+    Raises RuntimeError if the queue is not running or full, and
+    asyncio.TimeoutError if the result is not ready within AUX_TASK_TIMEOUT.
+    """
+    if _queue is None:
+        raise RuntimeError("Auxiliary task queue is not running")
+
+    future = asyncio.get_running_loop().create_future()
+    try:
+        _queue.put_nowait((func, future))
+    except asyncio.QueueFull:
+        raise RuntimeError("Auxiliary task queue is full")
+    return await asyncio.wait_for(future, timeout=settings.AUX_TASK_TIMEOUT)
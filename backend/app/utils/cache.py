@@ -0,0 +1,167 @@
+"""
+Caching utilities.
+
+TTLCache is a thread-safe in-memory LRU cache with per-entry expiry and
+hit/miss counters. PostgresCacheStore is an optional shared second level
+backed by the app.shared_cache table, so workers can reuse each other's entries.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from sqlalchemy import create_engine, text
+from app.config.settings import settings
+
+
+class TTLCache:
+    """In-memory LRU cache with a fixed time-to-live per entry."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Get size and hit-rate statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class PostgresCacheStore:
+    """
+    Shared cache level stored in app.shared_cache.
+
+    Entries are JSON values grouped by namespace. Expired rows are ignored on
+    read and purged periodically on write.
+    """
+
+    PURGE_EVERY = 100  # Writes between purges of expired rows
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._engine = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+        return self._engine
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing, expired or on DB error."""
+        try:
+            with self._get_engine().connect() as conn:
+                row = conn.execute(
+                    text(f"""
+                        SELECT value FROM {settings.DB_APP_SCHEMA}.shared_cache
+                        WHERE namespace = :namespace AND cache_key = :key
+                          AND expires_at > NOW()
+                    """),
+                    {"namespace": self.namespace, "key": key}
+                ).fetchone()
+        except Exception as e:
+            self.errors += 1
+            print(f"[WARNING] Shared cache read failed ({self.namespace}): {e}")
+            return None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable value for ttl seconds."""
+        try:
+            with self._get_engine().connect() as conn:
+                conn.execute(
+                    text(f"""
+                        INSERT INTO {settings.DB_APP_SCHEMA}.shared_cache
+                            (namespace, cache_key, value, expires_at)
+                        VALUES (:namespace, :key, CAST(:value AS JSONB),
+                                NOW() + make_interval(secs => :ttl))
+                        ON CONFLICT (namespace, cache_key) DO UPDATE SET
+                            value = EXCLUDED.value,
+                            expires_at = EXCLUDED.expires_at
+                    """),
+                    {"namespace": self.namespace, "key": key, "value": json.dumps(value), "ttl": ttl}
+                )
+
+                self._writes += 1
+                if self._writes % self.PURGE_EVERY == 0:
+                    conn.execute(
+                        text(f"""
+                            DELETE FROM {settings.DB_APP_SCHEMA}.shared_cache
+                            WHERE namespace = :namespace AND expires_at <= NOW()
+                        """),
+                        {"namespace": self.namespace}
+                    )
+                conn.commit()
+        except Exception as e:
+            self.errors += 1
+            print(f"[WARNING] Shared cache write failed ({self.namespace}): {e}")
+
+    def stats(self) -> dict:
+        """Get hit-rate statistics for this worker."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
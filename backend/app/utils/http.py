@@ -0,0 +1,66 @@
+"""
+Shared HTTP client for outbound calls (web search, Keycloak admin API).
+
+A single httpx.AsyncClient is kept per event loop so connections (DNS, TCP,
+TLS) are pooled and reused across requests instead of being set up per call.
+"""
+
+import asyncio
+import weakref
+from typing import Optional
+import httpx
+from app.config.settings import settings
+
+
+# One client per event loop (httpx connection pools are bound to their loop)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    """Create a pooled AsyncClient configured from settings."""
+    http2 = settings.HTTP_CLIENT_HTTP2
+    if http2 and not _http2_available():
+        print("[WARNING] HTTP_CLIENT_HTTP2 is enabled but 'h2' is not installed. Using HTTP/1.1.")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for the running event loop.
+
+    The client is created on first use and reused until close_http_client()
+    is called. Do not close the returned client directly.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _create_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Close the shared HTTP client of the given (default: running) event loop."""
+    loop = loop or asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
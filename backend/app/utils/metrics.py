@@ -0,0 +1,215 @@
+"""
+Prometheus metrics.
+
+Histograms for HTTP route latency, agent tool latency, embedding provider
+calls, upload chunk counts, DB pool checkouts and LLM time-to-first-token,
+plus DB pool saturation gauges. Exposed in Prometheus text format by the
+/metrics endpoint (see main.py).
+"""
+
+import functools
+import inspect
+import time
+import types
+import weakref
+from contextlib import contextmanager
+from typing import Iterator
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+
+# Bucket sets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+TOOL_DURATION = Histogram(
+    "agent_tool_duration_seconds",
+    "Agent tool call latency",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+)
+EMBEDDING_DURATION = Histogram(
+    "embedding_request_duration_seconds",
+    "Embedding provider call latency (one call per batch)",
+    ["embedder"],
+    buckets=LATENCY_BUCKETS,
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Texts per embedding provider call",
+    ["embedder"],
+    buckets=SIZE_BUCKETS,
+)
+UPLOAD_CHUNKS = Histogram(
+    "upload_chunks",
+    "Chunks created per uploaded file",
+    buckets=SIZE_BUCKETS,
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool (includes waiting when saturated)",
+    ["pool"],
+    buckets=CHECKOUT_BUCKETS,
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from a streaming model call to its first chunk",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def observe(histogram) -> Iterator[None]:
+    """Observe the duration of a block (sync or async code) in seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+def route_label(scope: dict) -> str:
+    """Route template for a request (e.g. /api/kb/{kb_id}), never the raw path."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def render_metrics():
+    """Render all metrics in Prometheus text format: (body, content type)."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# -----------------------------------------------------------------------------
+# Database pools
+# -----------------------------------------------------------------------------
+
+# Instrumented pools still alive, for the saturation gauges
+_pools: "weakref.WeakSet[InstrumentedQueuePool]" = weakref.WeakSet()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout latency; see create_instrumented_engine."""
+
+    metrics_name = "default"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.labels(pool=self.metrics_name).observe(time.perf_counter() - start)
+
+
+def create_instrumented_engine(name: str, url: str, **kwargs):
+    """
+    create_engine() whose pool reports checkout time and saturation as `name`.
+
+    The pool class is specialized per name so the label survives pool
+    recreation (dispose/invalidate).
+    """
+    pool_class = type(f"InstrumentedQueuePool_{name}", (InstrumentedQueuePool,), {"metrics_name": name})
+    return create_engine(url, poolclass=pool_class, **kwargs)
+
+
+class _PoolCollector:
+    """Collects in-use and capacity gauges from live instrumented pools at scrape time."""
+
+    def collect(self):
+        in_use = GaugeMetricFamily(
+            "db_pool_connections_in_use", "Connections checked out of the pool", labels=["pool"]
+        )
+        capacity = GaugeMetricFamily(
+            "db_pool_connections_max", "Pool size plus max overflow", labels=["pool"]
+        )
+        totals = {}
+        for pool in list(_pools):
+            used, limit = totals.get(pool.metrics_name, (0, 0))
+            # _max_overflow is -1 for an unbounded pool
+            totals[pool.metrics_name] = (
+                used + pool.checkedout(),
+                limit + pool.size() + max(pool._max_overflow, 0),
+            )
+        for name, (used, limit) in sorted(totals.items()):
+            in_use.add_metric([name], used)
+            capacity.add_metric([name], limit)
+        yield in_use
+        yield capacity
+
+
+REGISTRY.register(_PoolCollector())
+
+
+# -----------------------------------------------------------------------------
+# LLM streaming
+# -----------------------------------------------------------------------------
+
+def _model_label(model) -> str:
+    return f"{getattr(model, 'provider', None) or type(model).__name__}/{getattr(model, 'id', '')}"
+
+
+def _timed_invoke_stream(self, *args, **kwargs):
+    start = time.perf_counter()
+    first = True
+    for chunk in type(self).invoke_stream(self, *args, **kwargs):
+        if first:
+            LLM_TIME_TO_FIRST_TOKEN.labels(model=_model_label(self)).observe(time.perf_counter() - start)
+            first = False
+        yield chunk
+
+
+async def _timed_ainvoke_stream(self, *args, **kwargs):
+    start = time.perf_counter()
+    first = True
+    async for chunk in type(self).ainvoke_stream(self, *args, **kwargs):
+        if first:
+            LLM_TIME_TO_FIRST_TOKEN.labels(model=_model_label(self)).observe(time.perf_counter() - start)
+            first = False
+        yield chunk
+
+
+def instrument_model(model):
+    """
+    Record time-to-first-token for the model's streaming calls.
+
+    The stream methods are overridden on the instance as bound methods, so
+    copies the agent makes of the model stay instrumented.
+    """
+    model.invoke_stream = types.MethodType(_timed_invoke_stream, model)
+    model.ainvoke_stream = types.MethodType(_timed_ainvoke_stream, model)
+    return model
+
+
+# -----------------------------------------------------------------------------
+# Agent tools
+# -----------------------------------------------------------------------------
+
+def timed_tool(func):
+    """Decorator recording a tool's latency; keeps the name, docstring and signature the agent sees."""
+    histogram = TOOL_DURATION.labels(tool=func.__name__)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with observe(histogram):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with observe(histogram):
+            return func(*args, **kwargs)
+    return wrapper
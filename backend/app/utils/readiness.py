@@ -0,0 +1,179 @@
+"""
+Readiness probes with cached results.
+
+Dependency checks (database pool, pgvector query, embedding provider,
+Keycloak token) run in the background every READINESS_PROBE_INTERVAL
+seconds. /ready and the admin health endpoint serve the cached results with
+their measured latencies, so frequent load balancer checks cost nothing.
+
+A timed-out probe keeps running in its thread, so a probe is not started
+again until its previous run has finished, and database probes carry a
+server-side statement_timeout. The embedder probe only calls the provider
+(a billed request) every READINESS_EMBEDDER_CALL_INTERVAL seconds, if set.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+_engine = None
+
+# Latest result per probe, and when the last round finished
+_results: Dict[str, dict] = {}
+_checked_at: Optional[float] = None
+
+# Probe runs that may outlive their timeout, and the last real embedding call
+_in_flight: Dict[str, asyncio.Task] = {}
+_embedder_called_at: Optional[float] = None
+
+# Probes that do not make the service unready when they fail
+NON_CRITICAL = {"keycloak"}
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        # One connection is enough for SELECT 1 every few seconds
+        _engine = create_instrumented_engine(
+            "readiness", settings.DATABASE_URL, pool_size=1, max_overflow=0, pool_pre_ping=True,
+            pool_timeout=settings.READINESS_PROBE_TIMEOUT,
+            connect_args={"connect_timeout": max(1, int(settings.READINESS_PROBE_TIMEOUT))},
+        )
+    return _engine
+
+
+def _set_statement_timeout(conn) -> None:
+    """Let the server abort the probe query instead of leaving its thread blocked."""
+    timeout_ms = int(settings.READINESS_PROBE_TIMEOUT * 1000)
+    conn.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+
+
+def _probe_database() -> None:
+    with _get_engine().connect() as conn:
+        _set_statement_timeout(conn)
+        conn.execute(text("SELECT 1"))
+
+
+def _probe_vector_store() -> None:
+    """Nearest-neighbour query through the knowledge base's own pool."""
+    from app.knowledge.base import get_knowledge_base
+
+    table = f"{settings.DB_APP_SCHEMA}.knowledge_embeddings"
+    with get_knowledge_base().vector_db.db_engine.connect() as conn:
+        _set_statement_timeout(conn)
+        conn.execute(
+            text(f"""
+                SELECT id FROM {table}
+                WHERE embedding IS NOT NULL
+                ORDER BY embedding <=> (SELECT embedding FROM {table} WHERE embedding IS NOT NULL LIMIT 1)
+                LIMIT 1
+            """)
+        )
+
+
+async def _probe_embedder() -> None:
+    """
+    Check the embedder is configured; embed a short text with the provider
+    itself (bypassing cache and batching) at most every
+    READINESS_EMBEDDER_CALL_INTERVAL seconds.
+    """
+    global _embedder_called_at
+    from app.config.embedders import get_embedder
+
+    embedder, error, dimensions = get_embedder()
+    if embedder is None:
+        raise RuntimeError(error)
+
+    interval = settings.READINESS_EMBEDDER_CALL_INTERVAL
+    if interval <= 0 or (
+        _embedder_called_at is not None and time.monotonic() - _embedder_called_at < interval
+    ):
+        return
+    while getattr(embedder, "embedder", None) is not None:
+        embedder = embedder.embedder
+
+    _embedder_called_at = time.monotonic()
+    embedding = await asyncio.to_thread(embedder.get_embedding, "readiness probe")
+    if len(embedding) != dimensions:
+        raise RuntimeError(f"Embedding has {len(embedding)} dimensions, expected {dimensions}")
+
+
+async def _probe_keycloak() -> None:
+    from app.api.users import get_admin_token
+
+    await get_admin_token()
+
+
+async def _run_probe(name: str, probe: Callable[[], Awaitable[None]]) -> None:
+    start = time.perf_counter()
+    previous = _in_flight.get(name)
+    try:
+        if previous is not None and not previous.done():
+            raise RuntimeError("previous probe still running")
+        task = asyncio.ensure_future(probe())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _in_flight[name] = task
+        # Shielded: on timeout the run is left to finish and tracked above
+        await asyncio.wait_for(asyncio.shield(task), timeout=settings.READINESS_PROBE_TIMEOUT)
+        status, error = "ok", None
+    except asyncio.TimeoutError:
+        status, error = "fail", f"timed out after {settings.READINESS_PROBE_TIMEOUT}s"
+    except Exception as e:
+        status, error = "fail", getattr(e, "detail", None) or str(e)
+
+    _results[name] = {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "error": error,
+        "critical": name not in NON_CRITICAL,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def run_probes(use_knowledge: bool) -> None:
+    """Run all probes concurrently and store their results."""
+    global _checked_at
+
+    probes: Dict[str, Callable[[], Awaitable[None]]] = {
+        "database": lambda: asyncio.to_thread(_probe_database),
+        "keycloak": _probe_keycloak,
+    }
+    if use_knowledge:
+        probes["vector_store"] = lambda: asyncio.to_thread(_probe_vector_store)
+        probes["embedder"] = _probe_embedder
+
+    await asyncio.gather(*(_run_probe(name, probe) for name, probe in probes.items()))
+    _checked_at = time.monotonic()
+
+
+async def run_readiness_prober(use_knowledge: bool) -> None:
+    """Run the probes every READINESS_PROBE_INTERVAL seconds (until cancelled)."""
+    while True:
+        try:
+            await run_probes(use_knowledge)
+        except Exception as e:
+            print(f"[WARNING] Readiness probes failed: {e}")
+        await asyncio.sleep(settings.READINESS_PROBE_INTERVAL)
+
+
+def get_readiness() -> dict:
+    """
+    Get the cached readiness state.
+
+    Ready when every critical probe passed in a round that finished within
+    the last three intervals (a stalled prober makes the service unready).
+    """
+    age = time.monotonic() - _checked_at if _checked_at is not None else None
+    fresh = age is not None and age <= 3 * settings.READINESS_PROBE_INTERVAL
+    ready = fresh and all(r["status"] == "ok" for r in _results.values() if r["critical"])
+
+    return {
+        "ready": ready,
+        "age_seconds": round(age, 1) if age is not None else None,
+        "checks": dict(_results),
+    }
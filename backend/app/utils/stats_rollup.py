@@ -0,0 +1,183 @@
+"""
+Periodically refreshed admin statistics.
+
+The admin dashboard reads a rollup row (app.admin_stats_rollup) instead of
+scanning production tables. Row counts for large tables come from catalog
+estimates (pg_class.reltuples, kept current by autovacuum/ANALYZE), so a
+refresh never runs COUNT(*) over them. A background task refreshes the
+rollup every ADMIN_STATS_REFRESH_INTERVAL seconds; an advisory lock makes
+sure only one worker does it per interval. The count of documents not
+embedded with the current model (index-served, see count_stale_rows) is
+stored here too, so the embedding config endpoint reads it from the rollup.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+# Arbitrary key for pg_try_advisory_xact_lock (one refresher at a time)
+REFRESH_LOCK_KEY = 7_041_001
+
+# Large tables reported from catalog estimates
+ESTIMATED_TABLES = {
+    "total_sessions": "agent_sessions",
+    "total_knowledge_documents": "knowledge_embeddings",
+    "total_conversations": "conversations",
+}
+
+_engine = None
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_instrumented_engine("stats_rollup", settings.DATABASE_URL, pool_pre_ping=True)
+    return _engine
+
+
+def _estimate_rows(conn, table: str) -> int:
+    """Row estimate from pg_class.reltuples (n_live_tup if never analyzed)."""
+    row = conn.execute(
+        text("""
+            SELECT c.reltuples::bigint, COALESCE(s.n_live_tup, 0)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE n.nspname = :schema AND c.relname = :table
+        """),
+        {"schema": settings.DB_APP_SCHEMA, "table": table}
+    ).fetchone()
+    if row is None:
+        return 0
+    reltuples, live_tuples = row
+    # reltuples is -1 until the table is first vacuumed or analyzed
+    return reltuples if reltuples >= 0 else live_tuples
+
+
+def _stale_documents(conn) -> dict:
+    """Documents not embedded with the current model/dimension, tagged with that config."""
+    from app.config.embedders import get_current_embedding_config
+    from app.knowledge.reindex import count_stale_rows
+
+    try:
+        _, model, dimensions = get_current_embedding_config()
+    except ValueError:
+        return {}
+    return {
+        "stale_documents": count_stale_rows(conn, model, dimensions),
+        "stale_embedding": f"{model}/{dimensions}",
+    }
+
+
+def refresh_stats_rollup() -> bool:
+    """
+    Recompute the rollup if it is older than the refresh interval.
+
+    Returns True if this call refreshed it, False if it was still fresh or
+    another worker is refreshing it.
+    """
+    schema = settings.DB_APP_SCHEMA
+    with _get_engine().connect() as conn:
+        locked = conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        ).scalar()
+        if not locked:
+            return False
+
+        fresh = conn.execute(
+            text(f"""
+                SELECT 1 FROM {schema}.admin_stats_rollup
+                WHERE id = 1 AND refreshed_at > NOW() - make_interval(secs => :interval)
+            """),
+            {"interval": settings.ADMIN_STATS_REFRESH_INTERVAL}
+        ).fetchone()
+        if fresh:
+            return False
+
+        stats = {key: _estimate_rows(conn, table) for key, table in ESTIMATED_TABLES.items()}
+        stats["total_knowledge_bases"] = conn.execute(
+            text(f"SELECT COUNT(*) FROM {schema}.knowledge_bases WHERE is_active = true")
+        ).scalar() or 0
+        stats.update(_stale_documents(conn))
+
+        # Message counts for the 10 newest sessions (agent_sessions.runs is
+        # compacted, so it no longer holds every run)
+        recent_sessions = [
+            {
+                "session_id": str(row[0]),
+                "created_at": row[1].isoformat() if hasattr(row[1], "isoformat") else row[1],
+                "message_count": row[2] or 0,
+            }
+            for row in conn.execute(
+                text(f"""
+                    SELECT
+                        s.session_id,
+                        s.created_at,
+                        (
+                            SELECT COUNT(*) FROM {schema}.conversation_messages m
+                            -- Index lookup; sessions that are not conversations count 0
+                            WHERE m.conversation_id = CASE
+                                WHEN s.session_id ~* '^[0-9a-f]{{8}}-([0-9a-f]{{4}}-){{3}}[0-9a-f]{{12}}$'
+                                THEN CAST(s.session_id AS UUID)
+                            END
+                        ) as message_count
+                    FROM {schema}.agent_sessions s
+                    ORDER BY s.created_at DESC NULLS LAST
+                    LIMIT 10
+                """)
+            )
+        ]
+
+        conn.execute(
+            text(f"""
+                INSERT INTO {schema}.admin_stats_rollup (id, stats, recent_sessions, refreshed_at)
+                VALUES (1, CAST(:stats AS JSONB), CAST(:recent AS JSONB), NOW())
+                ON CONFLICT (id) DO UPDATE SET
+                    stats = EXCLUDED.stats,
+                    recent_sessions = EXCLUDED.recent_sessions,
+                    refreshed_at = EXCLUDED.refreshed_at
+            """),
+            {"stats": json.dumps(stats), "recent": json.dumps(recent_sessions)}
+        )
+        conn.commit()
+    return True
+
+
+def get_stats_rollup() -> Optional[dict]:
+    """Get the stored rollup with its freshness, or None if never computed."""
+    with _get_engine().connect() as conn:
+        row = conn.execute(
+            text(f"""
+                SELECT stats, recent_sessions, refreshed_at,
+                       EXTRACT(EPOCH FROM NOW() - refreshed_at)
+                FROM {settings.DB_APP_SCHEMA}.admin_stats_rollup
+                WHERE id = 1
+            """)
+        ).fetchone()
+    if row is None:
+        return None
+
+    age = float(row[3])
+    return {
+        "stats": row[0],
+        "recent_sessions": row[1],
+        "refreshed_at": row[2].isoformat() if isinstance(row[2], datetime) else row[2],
+        "age_seconds": round(age, 1),
+        # Missed more than one refresh: the refresher is not running
+        "stale": age > 2 * settings.ADMIN_STATS_REFRESH_INTERVAL,
+    }
+
+
+async def run_stats_refresher() -> None:
+    """Refresh the rollup every ADMIN_STATS_REFRESH_INTERVAL seconds (until cancelled)."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_stats_rollup)
+        except Exception as e:
+            print(f"[WARNING] Admin stats refresh failed: {e}")
+        await asyncio.sleep(settings.ADMIN_STATS_REFRESH_INTERVAL)
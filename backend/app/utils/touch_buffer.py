@@ -0,0 +1,88 @@
+"""
+Coalesced conversation touches.
+
+POST /api/conversations/{id}/touch checks ownership, then only records the
+touch in memory; a background task writes all pending touches as one
+UPDATE every CONVERSATION_TOUCH_FLUSH_INTERVAL seconds. Repeated touches of
+the same conversation within an interval collapse into one row update.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Tuple
+from sqlalchemy import text
+from app.config.settings import settings
+from app.utils.metrics import create_instrumented_engine
+
+
+_engine = None
+
+# conversation_id -> (user_id, time.monotonic() of the latest touch)
+_pending: Dict[str, Tuple[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_instrumented_engine("conversation_touch", settings.DATABASE_URL, pool_pre_ping=True)
+    return _engine
+
+
+def touch(conversation_id: str, user_id: str) -> None:
+    """Record that a conversation was active now (written on the next flush)."""
+    with _lock:
+        _pending[conversation_id] = (user_id, time.monotonic())
+
+
+def flush_touches() -> int:
+    """
+    Write pending touches in one UPDATE. Returns the number of conversations updated.
+
+    Each row gets NOW() minus the touch's age, so the stored time is when
+    the touch happened, not when it was flushed. On failure the touches are
+    put back (unless a newer touch arrived meanwhile) for the next flush.
+    """
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return 0
+
+    now = time.monotonic()
+    ids = list(pending)
+    try:
+        with _get_engine().connect() as conn:
+            result = conn.execute(
+                text(f"""
+                    UPDATE {settings.DB_APP_SCHEMA}.conversations c
+                    SET updated_at = GREATEST(c.updated_at, NOW() - make_interval(secs => t.age))
+                    FROM unnest(
+                        CAST(:ids AS UUID[]), CAST(:user_ids AS VARCHAR[]), CAST(:ages AS DOUBLE PRECISION[])
+                    ) AS t(id, user_id, age)
+                    WHERE c.id = t.id AND c.user_id = t.user_id
+                """),
+                {
+                    "ids": ids,
+                    "user_ids": [pending[cid][0] for cid in ids],
+                    "ages": [now - pending[cid][1] for cid in ids],
+                }
+            )
+            conn.commit()
+            return result.rowcount
+    except Exception:
+        with _lock:
+            for conversation_id, entry in pending.items():
+                _pending.setdefault(conversation_id, entry)
+        raise
+
+
+async def run_touch_flusher() -> None:
+    """Flush touches every CONVERSATION_TOUCH_FLUSH_INTERVAL seconds (until cancelled)."""
+    while True:
+        await asyncio.sleep(settings.CONVERSATION_TOUCH_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(flush_touches)
+        except Exception as e:
+            print(f"[WARNING] Conversation touch flush failed: {e}")
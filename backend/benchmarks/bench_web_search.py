@@ -0,0 +1,103 @@
+"""
+Benchmark for the search_web tool: latency percentiles and throughput.
+
+Runs search_web in-process under a fixed concurrency. By default a local
+fixture server is started (see fixture_server), so no external site is hit.
+
+Usage (from backend/):
+    python -m benchmarks.bench_web_search --requests 200 --concurrency 20
+    python -m benchmarks.bench_web_search --slow-rate 0.3 --error-rate 0.2
+    python -m benchmarks.bench_web_search --cache --distinct-queries 20
+"""
+import argparse
+import asyncio
+import math
+import os
+import time
+from typing import List
+from benchmarks.fixture_server import add_profile_arguments, profile_from_args, start_in_thread
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def _run(num_requests: int, concurrency: int, distinct_queries: int) -> dict:
+    """Issue num_requests searches with at most `concurrency` in flight."""
+    from app.tools.web_search import search_web
+    from app.utils.http import close_http_client
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            output = await search_web(f"benchmark query {i % distinct_queries}")
+            latencies.append(time.perf_counter() - start)
+            if output.startswith("Web search failed") or output.startswith("No search results"):
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(num_requests)))
+    elapsed = time.perf_counter() - started
+    await close_http_client()
+
+    return {
+        "requests": num_requests,
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "throughput_rps": num_requests / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p90_ms": _percentile(latencies, 90) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the search_web tool")
+    parser.add_argument("--requests", type=int, default=100, help="Total searches to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="Searches in flight")
+    parser.add_argument("--distinct-queries", type=int, default=0, help="Distinct queries (default: all distinct)")
+    parser.add_argument("--cache", action="store_true", help="Keep the web search cache enabled")
+    parser.add_argument("--backend-url", default="", help="Use an existing search endpoint instead of the fixture")
+    parser.add_argument("--port", type=int, default=8765, help="Fixture server port")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    backend_url = args.backend_url
+    if not backend_url:
+        server = start_in_thread(profile_from_args(args), port=args.port)
+        backend_url = f"http://127.0.0.1:{args.port}/html/"
+
+    # Settings are read at import time, so configure them before importing the app
+    os.environ["WEB_SEARCH_BACKEND_URL"] = backend_url
+    os.environ.setdefault("WEB_SEARCH_DELAY", "0")  # All fixture pages share one host
+    if not args.cache:
+        os.environ["WEB_SEARCH_CACHE_ENABLED"] = "false"
+
+    distinct = args.distinct_queries or args.requests
+    print(f"[INFO] Backend: {backend_url}")
+    print(f"[INFO] {args.requests} requests, concurrency {args.concurrency}, {distinct} distinct queries")
+
+    try:
+        result = asyncio.run(_run(args.requests, args.concurrency, distinct))
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    print(f"  requests:   {result['requests']} ({result['failures']} failed)")
+    print(f"  elapsed:    {result['elapsed_s']:.2f}s")
+    print(f"  throughput: {result['throughput_rps']:.2f} req/s")
+    print(f"  latency:    p50 {result['p50_ms']:.0f}ms | p90 {result['p90_ms']:.0f}ms | "
+          f"p99 {result['p99_ms']:.0f}ms | max {result['max_ms']:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
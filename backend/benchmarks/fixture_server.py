@@ -0,0 +1,148 @@
+"""
+Local stand-in for DuckDuckGo and result pages, for load testing web search.
+
+Serves DuckDuckGo-compatible result pages at /html/ and target pages at
+/page/{n}, with configurable latency, size and error profiles.
+
+Usage (from backend/):
+    python -m benchmarks.fixture_server --port 8765 --page-latency-ms 200 --error-rate 0.1
+
+Then point the backend at it:
+    WEB_SEARCH_BACKEND_URL=http://127.0.0.1:8765/html/
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from html import escape
+from urllib.parse import quote
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
+
+
+@dataclass
+class FixtureProfile:
+    """Latency, size and error profile of the fixture server."""
+    num_results: int = 10  # Results per search page
+    search_latency_ms: float = 50  # Latency of the search page
+    page_latency_ms: float = 100  # Base latency of target pages
+    page_jitter_ms: float = 100  # Random extra latency (uniform 0..jitter)
+    slow_rate: float = 0.1  # Fraction of pages that are slow
+    slow_latency_ms: float = 5000  # Latency of slow pages
+    page_kb: int = 100  # Target page size
+    error_rate: float = 0.05  # Fraction of pages returning HTTP 500
+    non_html_rate: float = 0.05  # Fraction of pages returning a PDF
+    seed: int = 42  # Same query/page always gets the same behaviour
+
+
+def _page_html(title: str, size_kb: int) -> str:
+    """Build an HTML page of roughly size_kb kilobytes."""
+    paragraph = (
+        "<p>This is benchmark fixture content used to exercise the web search "
+        "pipeline, including fetching, parsing and text extraction.</p>\n"
+    )
+    count = max(1, (size_kb * 1024) // len(paragraph))
+    return (
+        f"<html><head><title>{escape(title)}</title></head>"
+        f"<body><article><h1>{escape(title)}</h1>\n{paragraph * count}</article></body></html>"
+    )
+
+
+def create_app(profile: FixtureProfile) -> FastAPI:
+    """Create the fixture FastAPI app for a profile."""
+    app = FastAPI(title="Web search fixture server")
+    page_body = _page_html("Fixture page", profile.page_kb)
+
+    @app.get("/html/")
+    async def search_page(request: Request, q: str = ""):
+        await asyncio.sleep(profile.search_latency_ms / 1000)
+
+        base = str(request.base_url).rstrip("/")
+        items = []
+        for n in range(profile.num_results):
+            target = f"{base}/page/{n}?q={quote(q)}"
+            items.append(
+                '<div class="result">'
+                f'<h2 class="result__title"><a href="//duckduckgo.com/l/?uddg={quote(target, safe="")}">'
+                f'Result {n + 1} for {escape(q)}</a></h2>'
+                f'<a class="result__snippet">Snippet {n + 1} for {escape(q)}</a>'
+                '</div>'
+            )
+        return HTMLResponse(f"<html><body>{''.join(items)}</body></html>")
+
+    @app.get("/page/{n}")
+    async def target_page(n: int, q: str = ""):
+        rng = random.Random(f"{profile.seed}:{q}:{n}")
+
+        latency = profile.page_latency_ms + rng.uniform(0, profile.page_jitter_ms)
+        if rng.random() < profile.slow_rate:
+            latency = profile.slow_latency_ms
+        await asyncio.sleep(latency / 1000)
+
+        roll = rng.random()
+        if roll < profile.error_rate:
+            return Response("Internal Server Error", status_code=500)
+        if roll < profile.error_rate + profile.non_html_rate:
+            return Response(b"%PDF-1.4 fixture", media_type="application/pdf")
+        return HTMLResponse(page_body)
+
+    return app
+
+
+def start_in_thread(profile: FixtureProfile, host: str = "127.0.0.1", port: int = 8765) -> uvicorn.Server:
+    """Start the fixture server on a background thread and wait until it is ready."""
+    config = uvicorn.Config(create_app(profile), host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="fixture-server", daemon=True)
+    thread.start()
+
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Fixture server failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return server
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add FixtureProfile options to an argument parser."""
+    defaults = FixtureProfile()
+    parser.add_argument("--num-results", type=int, default=defaults.num_results)
+    parser.add_argument("--search-latency-ms", type=float, default=defaults.search_latency_ms)
+    parser.add_argument("--page-latency-ms", type=float, default=defaults.page_latency_ms)
+    parser.add_argument("--page-jitter-ms", type=float, default=defaults.page_jitter_ms)
+    parser.add_argument("--slow-rate", type=float, default=defaults.slow_rate)
+    parser.add_argument("--slow-latency-ms", type=float, default=defaults.slow_latency_ms)
+    parser.add_argument("--page-kb", type=int, default=defaults.page_kb)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--non-html-rate", type=float, default=defaults.non_html_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def profile_from_args(args: argparse.Namespace) -> FixtureProfile:
+    """Build a FixtureProfile from parsed arguments."""
+    return FixtureProfile(
+        num_results=args.num_results,
+        search_latency_ms=args.search_latency_ms,
+        page_latency_ms=args.page_latency_ms,
+        page_jitter_ms=args.page_jitter_ms,
+        slow_rate=args.slow_rate,
+        slow_latency_ms=args.slow_latency_ms,
+        page_kb=args.page_kb,
+        error_rate=args.error_rate,
+        non_html_rate=args.non_html_rate,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Web search fixture server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"[INFO] Fixture server: http://{args.host}:{args.port}/html/")
+    uvicorn.run(create_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
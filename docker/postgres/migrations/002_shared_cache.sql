@@ -0,0 +1,19 @@
+-- =============================================================================
+-- Shared Cache
+-- =============================================================================
+-- Optional cross-worker cache level (e.g. web search results and pages).
+-- Used when WEB_SEARCH_CACHE_BACKEND=postgres.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS app.shared_cache (
+    namespace VARCHAR(50) NOT NULL,
+    cache_key TEXT NOT NULL,
+    value JSONB NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (namespace, cache_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_shared_cache_expires_at ON app.shared_cache(expires_at);
+
+COMMENT ON TABLE app.shared_cache IS 'Shared TTL cache entries (web search results, fetched pages)';
+COMMENT ON COLUMN app.shared_cache.namespace IS 'Cache level, e.g. web_search_query or web_search_page';
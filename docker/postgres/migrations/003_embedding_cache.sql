@@ -0,0 +1,25 @@
+-- =============================================================================
+-- Embedding Cache
+-- =============================================================================
+-- Persistent cache of embeddings keyed by model, dimension and content hash,
+-- so re-adding documents, reindexing and repeated queries reuse vectors
+-- instead of calling the embedding provider again.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS app.embedding_cache (
+    model VARCHAR(150) NOT NULL,
+    dimensions INTEGER NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    embedding vector NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_used_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (model, dimensions, content_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used_at ON app.embedding_cache(last_used_at);
+
+COMMENT ON TABLE app.embedding_cache IS 'Embedding vectors reused across uploads, reindex and search queries';
+COMMENT ON COLUMN app.embedding_cache.model IS 'Provider and model ID, e.g. openai/text-embedding-3-small';
+COMMENT ON COLUMN app.embedding_cache.content_hash IS 'SHA-256 of the embedded text';
+COMMENT ON COLUMN app.embedding_cache.hit_count IS 'Number of times this vector was reused';
@@ -0,0 +1,25 @@
+-- =============================================================================
+-- Configurable Embedding Dimension
+-- =============================================================================
+-- EMBEDDING_DIMENSION lets text-embedding-3 models return shorter vectors
+-- (e.g. 512 or 768 instead of 1536), and text-embedding-3-large defaults to
+-- 3072. pgvector ivfflat indexes support at most 2000 dimensions, so the
+-- index is only recreated when the new size allows it.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION app.update_embedding_dimension(new_dimensions INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    DROP INDEX IF EXISTS app.idx_ke_embedding;
+    TRUNCATE TABLE app.knowledge_embeddings;
+    EXECUTE format('ALTER TABLE app.knowledge_embeddings ALTER COLUMN embedding TYPE vector(%s)', new_dimensions);
+    IF new_dimensions <= 2000 THEN
+        CREATE INDEX idx_ke_embedding ON app.knowledge_embeddings
+            USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    ELSE
+        RAISE NOTICE 'Vector index skipped: % dimensions exceeds the 2000 supported by ivfflat', new_dimensions;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON COLUMN app.embedding_config.dimensions IS 'Vector dimensions (model default or EMBEDDING_DIMENSION)';
@@ -0,0 +1,55 @@
+-- =============================================================================
+-- Background Reindex Jobs
+-- =============================================================================
+-- Reindex runs as a background job that re-embeds knowledge_embeddings rows
+-- in place, in id order. Progress and the last processed id are checkpointed
+-- here so a paused, cancelled or interrupted job can be resumed.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS app.reindex_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    status VARCHAR(20) NOT NULL CHECK (status IN ('running', 'paused', 'cancelled', 'completed', 'failed')),
+    requested_action VARCHAR(20) CHECK (requested_action IN ('pause', 'cancel')),
+    provider VARCHAR(50) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    dimensions INTEGER NOT NULL,
+    total_rows INTEGER NOT NULL DEFAULT 0,
+    processed_rows INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0,
+    last_id VARCHAR(255),
+    error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_reindex_jobs_created_at ON app.reindex_jobs(created_at DESC);
+
+COMMENT ON TABLE app.reindex_jobs IS 'Background reindex jobs with checkpointed progress';
+COMMENT ON COLUMN app.reindex_jobs.requested_action IS 'Pause or cancel request, picked up by the worker running the job';
+COMMENT ON COLUMN app.reindex_jobs.last_id IS 'Checkpoint: every row with id <= last_id has been processed';
+COMMENT ON COLUMN app.reindex_jobs.updated_at IS 'Heartbeat, refreshed at every checkpoint';
+
+-- -----------------------------------------------------------------------------
+-- Keep rows when the dimension changes
+-- -----------------------------------------------------------------------------
+-- Embeddings are cleared (NULL) instead of truncating the table, so content,
+-- metadata and knowledge_base_id survive and the reindex job can re-embed
+-- the rows in place.
+CREATE OR REPLACE FUNCTION app.update_embedding_dimension(new_dimensions INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    DROP INDEX IF EXISTS app.idx_ke_embedding;
+    EXECUTE format(
+        'ALTER TABLE app.knowledge_embeddings ALTER COLUMN embedding TYPE vector(%s) USING NULL',
+        new_dimensions
+    );
+    IF new_dimensions <= 2000 THEN
+        CREATE INDEX idx_ke_embedding ON app.knowledge_embeddings
+            USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    ELSE
+        RAISE NOTICE 'Vector index skipped: % dimensions exceeds the 2000 supported by ivfflat', new_dimensions;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
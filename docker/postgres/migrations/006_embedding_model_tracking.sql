@@ -0,0 +1,52 @@
+-- =============================================================================
+-- Per-row Embedding Model Tracking
+-- =============================================================================
+-- Each embedding row records the model and dimension it was produced with,
+-- so reindex can target only rows that differ from embedding_config, or a
+-- single knowledge base.
+-- =============================================================================
+
+ALTER TABLE app.knowledge_embeddings ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100);
+ALTER TABLE app.knowledge_embeddings ADD COLUMN IF NOT EXISTS embedding_dimensions INTEGER;
+
+-- Existing vectors were produced with the stored configuration
+UPDATE app.knowledge_embeddings ke
+SET embedding_model = ec.model,
+    embedding_dimensions = ec.dimensions
+FROM app.embedding_config ec
+WHERE ec.id = 1
+  AND ke.embedding_model IS NULL
+  AND ke.embedding IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ke_embedding_model ON app.knowledge_embeddings(embedding_model, embedding_dimensions);
+
+COMMENT ON COLUMN app.knowledge_embeddings.embedding_model IS 'Embedding model that produced the vector (NULL if not embedded)';
+COMMENT ON COLUMN app.knowledge_embeddings.embedding_dimensions IS 'Dimension of the vector when it was produced';
+
+-- Vectors cleared by a dimension change no longer belong to any model
+CREATE OR REPLACE FUNCTION app.update_embedding_dimension(new_dimensions INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    DROP INDEX IF EXISTS app.idx_ke_embedding;
+    EXECUTE format(
+        'ALTER TABLE app.knowledge_embeddings ALTER COLUMN embedding TYPE vector(%s) USING NULL',
+        new_dimensions
+    );
+    UPDATE app.knowledge_embeddings SET embedding_model = NULL, embedding_dimensions = NULL;
+    IF new_dimensions <= 2000 THEN
+        CREATE INDEX idx_ke_embedding ON app.knowledge_embeddings
+            USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    ELSE
+        RAISE NOTICE 'Vector index skipped: % dimensions exceeds the 2000 supported by ivfflat', new_dimensions;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- -----------------------------------------------------------------------------
+-- Reindex job scope
+-- -----------------------------------------------------------------------------
+ALTER TABLE app.reindex_jobs ADD COLUMN IF NOT EXISTS knowledge_base_id UUID REFERENCES app.knowledge_bases(id) ON DELETE CASCADE;
+ALTER TABLE app.reindex_jobs ADD COLUMN IF NOT EXISTS stale_only BOOLEAN NOT NULL DEFAULT false;
+
+COMMENT ON COLUMN app.reindex_jobs.knowledge_base_id IS 'Only reindex this knowledge base (NULL = all)';
+COMMENT ON COLUMN app.reindex_jobs.stale_only IS 'Only reindex rows whose model or dimension differs from the job''s';
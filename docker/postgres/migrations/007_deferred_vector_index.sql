@@ -0,0 +1,20 @@
+-- =============================================================================
+-- Deferred Vector Index
+-- =============================================================================
+-- An ivfflat index built on an empty table trains its centroids on no data,
+-- and keeping it during a bulk load slows every insert. The dimension change
+-- now only drops the index; the reindex job rebuilds it with
+-- CREATE INDEX CONCURRENTLY once the rows are loaded, then runs ANALYZE.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION app.update_embedding_dimension(new_dimensions INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    DROP INDEX IF EXISTS app.idx_ke_embedding;
+    EXECUTE format(
+        'ALTER TABLE app.knowledge_embeddings ALTER COLUMN embedding TYPE vector(%s) USING NULL',
+        new_dimensions
+    );
+    UPDATE app.knowledge_embeddings SET embedding_model = NULL, embedding_dimensions = NULL;
+END;
+$$ LANGUAGE plpgsql;
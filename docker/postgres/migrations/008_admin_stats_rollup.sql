@@ -0,0 +1,17 @@
+-- =============================================================================
+-- Admin Statistics Rollup
+-- =============================================================================
+-- The admin dashboard reads precomputed statistics instead of running
+-- COUNT(*) over agent_sessions and knowledge_embeddings on every refresh.
+-- The backend refreshes this row every ADMIN_STATS_REFRESH_INTERVAL seconds.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS app.admin_stats_rollup (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    stats JSONB NOT NULL,
+    recent_sessions JSONB NOT NULL DEFAULT '[]'::jsonb,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE app.admin_stats_rollup IS 'Periodically refreshed admin dashboard statistics (singleton)';
+COMMENT ON COLUMN app.admin_stats_rollup.stats IS 'Row counts; large tables use pg_class.reltuples estimates';
@@ -0,0 +1,17 @@
+-- =============================================================================
+-- Conversation Listing Index
+-- =============================================================================
+-- The conversation list is paginated by keyset over (updated_at, id) per
+-- user. One composite index serves both the user filter and the ordering,
+-- replacing the separate user_id and updated_at indexes.
+-- =============================================================================
+
+-- Row comparisons in the keyset predicate need a non-null updated_at
+UPDATE app.conversations SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+ALTER TABLE app.conversations ALTER COLUMN updated_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated
+    ON app.conversations(user_id, updated_at DESC, id DESC);
+
+DROP INDEX IF EXISTS app.idx_conversations_user_id;
+DROP INDEX IF EXISTS app.idx_conversations_updated_at;
@@ -0,0 +1,57 @@
+-- =============================================================================
+-- Conversation Messages
+-- =============================================================================
+-- User and assistant messages copied out of Agno's agent_sessions.runs when
+-- a run completes (see app/agents/conversation_messages.py), so history
+-- reads are index range scans instead of JSONB parsing of the runs blob.
+-- Messages Agno re-attaches as context (from_history) are not copied.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS app.conversation_messages (
+    id BIGSERIAL PRIMARY KEY,
+    conversation_id UUID NOT NULL REFERENCES app.conversations(id) ON DELETE CASCADE,
+    run_id VARCHAR(100),
+    message_id VARCHAR(100) NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    UNIQUE (conversation_id, message_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_messages_conversation_created
+    ON app.conversation_messages(conversation_id, created_at, id);
+
+COMMENT ON TABLE app.conversation_messages IS 'Denormalized user/assistant messages per conversation (from agent_sessions.runs)';
+COMMENT ON COLUMN app.conversation_messages.message_id IS 'Agno message ID (idempotent inserts)';
+
+-- Backfill conversations that have no messages yet (agent_sessions is
+-- created by Agno, so it may not exist on a fresh database)
+DO $$
+BEGIN
+    IF to_regclass('app.agent_sessions') IS NOT NULL THEN
+        INSERT INTO app.conversation_messages (conversation_id, run_id, message_id, role, content, created_at)
+        SELECT
+            c.id,
+            r.value->>'run_id',
+            m.value->>'id',
+            m.value->>'role',
+            CASE WHEN jsonb_typeof(m.value->'content') = 'string'
+                 THEN m.value->>'content' ELSE (m.value->'content')::text END,
+            COALESCE(to_timestamp((m.value->>'created_at')::double precision)::timestamp, c.created_at, NOW())
+        FROM app.agent_sessions s
+        JOIN app.conversations c ON c.id::text = s.session_id
+        CROSS JOIN LATERAL jsonb_array_elements(COALESCE(s.runs, '[]'::jsonb))
+            WITH ORDINALITY AS r(value, ord)
+        CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.value->'messages', '[]'::jsonb))
+            WITH ORDINALITY AS m(value, ord)
+        WHERE m.value->>'role' IN ('user', 'assistant')
+          AND m.value->>'id' IS NOT NULL
+          AND COALESCE((m.value->>'from_history')::boolean, false) = false
+          AND COALESCE(m.value->'content', 'null'::jsonb) NOT IN ('null', '""', '[]')
+          AND NOT EXISTS (
+              SELECT 1 FROM app.conversation_messages cm WHERE cm.conversation_id = c.id
+          )
+        ORDER BY c.id, r.ord, m.ord
+        ON CONFLICT (conversation_id, message_id) DO NOTHING;
+    END IF;
+END $$;
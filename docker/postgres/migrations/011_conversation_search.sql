@@ -0,0 +1,17 @@
+-- =============================================================================
+-- Conversation Full-Text Search
+-- =============================================================================
+-- A stored tsvector per message, computed by Postgres on insert (so it is
+-- maintained incrementally as runs complete), with a GIN index for
+-- GET /api/conversations/search. The 'simple' configuration does no
+-- stemming or stop words, since conversations are in any language.
+-- =============================================================================
+
+ALTER TABLE app.conversation_messages
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_conversation_messages_search
+    ON app.conversation_messages USING GIN (search_vector);
+
+COMMENT ON COLUMN app.conversation_messages.search_vector IS 'Full-text search vector (simple config) over content';
@@ -0,0 +1,48 @@
+-- =============================================================================
+-- Agent Session Runs Archive
+-- =============================================================================
+-- Agno stores every run of a session in agent_sessions.runs and rewrites the
+-- whole value each turn. The backend moves runs beyond the most recent
+-- SESSION_LIVE_RUNS here when a run completes (see
+-- app/agents/session_compaction.py), keeping the live row bounded.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS app.agent_session_runs_archive (
+    session_id VARCHAR(255) NOT NULL,
+    run_id VARCHAR(255) NOT NULL,
+    run JSONB NOT NULL,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (session_id, run_id)
+);
+
+COMMENT ON TABLE app.agent_session_runs_archive IS 'Runs compacted out of agent_sessions.runs (oldest first per session)';
+
+-- One-time compaction of existing sessions to the default of 20 live runs
+-- (agent_sessions is created by Agno, so it may not exist on a fresh database)
+DO $$
+BEGIN
+    IF to_regclass('app.agent_sessions') IS NOT NULL THEN
+        INSERT INTO app.agent_session_runs_archive (session_id, run_id, run, created_at)
+        SELECT
+            s.session_id,
+            COALESCE(r.value->>'run_id', s.session_id || ':' || r.ord),
+            r.value,
+            to_timestamp((r.value->>'created_at')::double precision)::timestamp
+        FROM app.agent_sessions s
+        CROSS JOIN LATERAL jsonb_array_elements(s.runs) WITH ORDINALITY AS r(value, ord)
+        WHERE jsonb_typeof(s.runs) = 'array'
+          AND jsonb_array_length(s.runs) > 20
+          AND r.ord <= jsonb_array_length(s.runs) - 20
+        ON CONFLICT (session_id, run_id) DO NOTHING;
+
+        UPDATE app.agent_sessions s
+        SET runs = (
+            SELECT jsonb_agg(r.value ORDER BY r.ord)
+            FROM jsonb_array_elements(s.runs) WITH ORDINALITY AS r(value, ord)
+            WHERE r.ord > jsonb_array_length(s.runs) - 20
+        )
+        WHERE jsonb_typeof(s.runs) = 'array'
+          AND jsonb_array_length(s.runs) > 20;
+    END IF;
+END $$;
@@ -0,0 +1,25 @@
+-- =============================================================================
+-- One Active Reindex Job
+-- =============================================================================
+-- start_job checks for an active job before inserting its own, but two
+-- workers can pass that check at the same time. A partial unique index lets
+-- at most one job be running or paused; the losing insert fails and is
+-- reported as "a job is already active" (see app/knowledge/reindex.py).
+-- =============================================================================
+
+-- Older duplicates would block the index; keep only the newest active job
+UPDATE app.reindex_jobs
+SET status = 'cancelled', requested_action = NULL,
+    error = 'Superseded by a newer reindex job',
+    updated_at = NOW(), finished_at = NOW()
+WHERE status IN ('running', 'paused')
+  AND id <> (
+      SELECT id FROM app.reindex_jobs
+      WHERE status IN ('running', 'paused')
+      ORDER BY created_at DESC
+      LIMIT 1
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reindex_jobs_single_active
+    ON app.reindex_jobs ((true))
+    WHERE status IN ('running', 'paused');
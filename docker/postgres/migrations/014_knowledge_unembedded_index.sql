@@ -0,0 +1,12 @@
+-- =============================================================================
+-- Unembedded Rows Index
+-- =============================================================================
+-- The admin stats rollup counts rows that are stale for the current
+-- embedding config. Rows with a vector from another model/dimension are
+-- found through idx_ke_embedding_model; this partial index covers rows that
+-- have no vector at all, so the count never scans knowledge_embeddings.
+-- =============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_ke_unembedded
+    ON app.knowledge_embeddings(id)
+    WHERE embedding IS NULL;
@@ -0,0 +1,13 @@
+-- =============================================================================
+-- Per-user Conversation Search
+-- =============================================================================
+-- The GIN index on search_vector matched a term across every user's
+-- messages before the user filter applied, so a common term cost work
+-- proportional to all tenants' data. Search now walks the caller's
+-- conversations and their messages through
+-- idx_conversation_messages_conversation_created, filtering on the stored
+-- search_vector, so its cost scales with the caller's own history. The GIN
+-- index is no longer read and only slowed down inserts.
+-- =============================================================================
+
+DROP INDEX IF EXISTS app.idx_conversation_messages_search;
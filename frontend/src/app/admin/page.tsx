@@ -44,6 +44,8 @@ interface EmbeddingConfig {
   status: string;
   needs_reindex: boolean;
   message: string | null;
+  stale_documents?: number;
+  stale_only?: boolean;
 }
 
 export default function AdminPage() {
@@ -94,7 +96,12 @@ export default function AdminPage() {
   };
 
   const handleReindex = async () => {
-    if (!confirm("This will re-embed all documents with the current embedding provider. Continue?")) {
+    // Only documents embedded with another model need re-embedding when the config is unchanged
+    const staleOnly = embeddingConfig?.needs_reindex === true && embeddingConfig.stale_only === true;
+    const prompt = staleOnly
+      ? `This will re-embed ${embeddingConfig?.stale_documents} stale document(s) with the current embedding provider. Continue?`
+      : "This will re-embed all documents with the current embedding provider. Continue?";
+    if (!confirm(prompt)) {
       return;
     }
 
@@ -102,7 +109,11 @@ export default function AdminPage() {
     setReindexResult(null);
 
     try {
-      const res = await fetch("/api/admin/reindex", { method: "POST" });
+      const res = await fetch("/api/admin/reindex", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ stale_only: staleOnly }),
+      });
       const data = await res.json();
 
       if (res.ok) {
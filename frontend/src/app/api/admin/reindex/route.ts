@@ -1,7 +1,7 @@
 import { NextResponse } from "next/server";
 import { auth } from "@/auth";
 
-export async function POST() {
+export async function POST(request: Request) {
   const session = await auth();
 
   if (!session) {
@@ -20,6 +20,8 @@ export async function POST() {
     const response = await fetch(`${process.env.BACKEND_URL || "http://localhost:8000"}/api/admin/reindex`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
+      // Forward the job options (knowledge_base_id, stale_only)
+      body: (await request.text()) || undefined,
     });
 
     const data = await response.json();
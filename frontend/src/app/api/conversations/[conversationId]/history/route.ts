@@ -17,9 +17,12 @@ export async function GET(
   const user = session.user as { id?: string };
   const userId = user.id || session.user.email || "anonymous";
 
+  // Forward pagination parameters (limit, before)
+  const search = request.nextUrl.search;
+
   try {
     const res = await fetch(
-      `${BACKEND_URL}/api/conversations/${conversationId}/history`,
+      `${BACKEND_URL}/api/conversations/${conversationId}/history${search}`,
       {
         method: "GET",
         headers: {
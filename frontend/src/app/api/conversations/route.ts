@@ -1,7 +1,7 @@
 import { NextResponse } from "next/server";
 import { auth } from "@/auth";
 
-export async function GET() {
+export async function GET(request: Request) {
   const session = await auth();
 
   if (!session) {
@@ -10,9 +10,12 @@ export async function GET() {
 
   const user = session.user as { id: string };
 
+  // Forward pagination parameters (limit, cursor)
+  const { search } = new URL(request.url);
+
   try {
     const response = await fetch(
-      `${process.env.BACKEND_URL || "http://localhost:8000"}/api/conversations`,
+      `${process.env.BACKEND_URL || "http://localhost:8000"}/api/conversations${search}`,
       {
         method: "GET",
         headers: {
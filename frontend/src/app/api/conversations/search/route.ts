@@ -0,0 +1,35 @@
+import { NextRequest, NextResponse } from "next/server";
+import { auth } from "@/auth";
+
+const BACKEND_URL = process.env.BACKEND_URL || "http://localhost:8000";
+
+export async function GET(request: NextRequest) {
+  const session = await auth();
+  if (!session?.user) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  const user = session.user as { id?: string };
+  const userId = user.id || session.user.email || "anonymous";
+
+  try {
+    const res = await fetch(
+      `${BACKEND_URL}/api/conversations/search${request.nextUrl.search}`,
+      {
+        method: "GET",
+        headers: {
+          "X-User-ID": userId,
+        },
+      }
+    );
+
+    const data = await res.json();
+    return NextResponse.json(data, { status: res.status });
+  } catch (error) {
+    console.error("Search conversations error:", error);
+    return NextResponse.json(
+      { error: "Failed to search conversations" },
+      { status: 500 }
+    );
+  }
+}
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { useSession } from "next-auth/react";
 import { useRouter } from "next/navigation";
 import { SidebarProvider, SidebarInset, SidebarTrigger } from "@/components/ui/sidebar";
@@ -18,8 +18,29 @@ import {
   X,
   RefreshCw,
   Plus,
+  Search,
 } from "lucide-react";
 
+interface SearchResult {
+  id: string;
+  title: string;
+  updated_at: string | null;
+  matches: number;
+  snippet: string;
+}
+
+// Render a search snippet, highlighting the <mark>...</mark> spans without injecting HTML
+function Snippet({ text }: { text: string }) {
+  const parts = text.split(/<mark>|<\/mark>/);
+  return (
+    <p className="text-sm text-muted-foreground mt-1">
+      {parts.map((part, i) =>
+        i % 2 === 1 ? <mark key={i} className="bg-yellow-200 dark:bg-yellow-800 rounded px-0.5">{part}</mark> : part
+      )}
+    </p>
+  );
+}
+
 export default function ConversationsPage() {
   const { data: session, status } = useSession();
   const router = useRouter();
@@ -27,6 +48,8 @@ export default function ConversationsPage() {
     conversations,
     currentConversationId,
     loading,
+    hasMore,
+    loadMoreConversations,
     setCurrentConversationId,
     createConversation,
     updateConversation,
@@ -39,6 +62,29 @@ export default function ConversationsPage() {
   const [editingId, setEditingId] = useState<string | null>(null);
   const [editTitle, setEditTitle] = useState("");
   const [deleting, setDeleting] = useState(false);
+  const [searchQuery, setSearchQuery] = useState("");
+  const [searchResults, setSearchResults] = useState<SearchResult[] | null>(null);
+
+  // Debounced full-text search over message content
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+    const timeout = setTimeout(async () => {
+      try {
+        const res = await fetch(`/api/conversations/search?q=${encodeURIComponent(query)}`);
+        if (res.ok) {
+          const data = await res.json();
+          setSearchResults(data.results || []);
+        }
+      } catch (error) {
+        console.error("Failed to search conversations:", error);
+      }
+    }, 300);
+    return () => clearTimeout(timeout);
+  }, [searchQuery]);
 
   const toggleSelection = (id: string) => {
     const newSelected = new Set(selectedIds);
@@ -162,7 +208,41 @@ export default function ConversationsPage() {
         </header>
         <main className="flex-1 p-6">
           <div className="max-w-4xl mx-auto">
-            {loading ? (
+            <div className="relative mb-4">
+              <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-muted-foreground" />
+              <Input
+                value={searchQuery}
+                onChange={(e) => setSearchQuery(e.target.value)}
+                placeholder="Search messages..."
+                className="pl-9"
+              />
+            </div>
+            {searchResults !== null ? (
+              searchResults.length === 0 ? (
+                <div className="flex items-center justify-center h-32 text-muted-foreground">
+                  No matching conversations
+                </div>
+              ) : (
+                <div className="space-y-2">
+                  {searchResults.map((result) => (
+                    <div
+                      key={result.id}
+                      className="p-4 border rounded-lg bg-card cursor-pointer hover:bg-muted/30 transition-colors"
+                      onClick={() => handleSelectConversation(result.id)}
+                    >
+                      <div className="flex items-center gap-2">
+                        <MessageSquare className="h-4 w-4 text-muted-foreground" />
+                        <span className="font-medium">{result.title}</span>
+                        <span className="text-xs text-muted-foreground ml-auto">
+                          {result.matches} match{result.matches === 1 ? "" : "es"} • {formatDate(result.updated_at)}
+                        </span>
+                      </div>
+                      <Snippet text={result.snippet} />
+                    </div>
+                  ))}
+                </div>
+              )
+            ) : loading ? (
               <div className="flex items-center justify-center h-64 text-muted-foreground">
                 Loading conversations...
               </div>
@@ -290,6 +370,14 @@ export default function ConversationsPage() {
                     </div>
                   ))}
                 </div>
+
+                {hasMore && (
+                  <div className="flex justify-center">
+                    <Button variant="outline" onClick={loadMoreConversations}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </div>
             )}
           </div>
@@ -104,6 +104,7 @@ function ChatInner({ conversationId, title }: { conversationId: string; title: s
   const titleGeneratedRef = useRef(false);
   const [history, setHistory] = useState<HistoryMessage[]>([]);
   const [historyLoaded, setHistoryLoaded] = useState(false);
+  const [historyBefore, setHistoryBefore] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   // Fetch history when conversation changes
@@ -114,6 +115,7 @@ function ChatInner({ conversationId, title }: { conversationId: string; title: s
         if (res.ok) {
           const data = await res.json();
           setHistory(data.messages || []);
+          setHistoryBefore(data.next_before || null);
         }
       } catch (error) {
         console.error("Failed to fetch history:", error);
@@ -123,17 +125,34 @@ function ChatInner({ conversationId, title }: { conversationId: string; title: s
     };
 
     setHistory([]);
+    setHistoryBefore(null);
     setHistoryLoaded(false);
     titleGeneratedRef.current = false;
     fetchHistory();
   }, [conversationId]);
 
-  // Scroll to bottom when history loads
+  // Scroll to bottom when history loads (not when older messages are prepended)
   useEffect(() => {
     if (historyLoaded && messagesEndRef.current) {
       messagesEndRef.current.scrollIntoView({ behavior: "instant" });
     }
-  }, [historyLoaded, history]);
+  }, [historyLoaded]);
+
+  const loadEarlierMessages = useCallback(async () => {
+    if (!historyBefore) return;
+    try {
+      const res = await fetch(
+        `/api/conversations/${conversationId}/history?before=${encodeURIComponent(historyBefore)}`
+      );
+      if (res.ok) {
+        const data = await res.json();
+        setHistory(prev => [...(data.messages || []), ...prev]);
+        setHistoryBefore(data.next_before || null);
+      }
+    } catch (error) {
+      console.error("Failed to fetch earlier messages:", error);
+    }
+  }, [conversationId, historyBefore]);
 
   const handleMessageIntercepted = useCallback((message: string) => {
     // Generate title on first message if still default
@@ -166,6 +185,13 @@ function ChatInner({ conversationId, title }: { conversationId: string; title: s
       <div className="flex flex-col h-full">
         {/* History messages */}
         <div className="flex-1 overflow-y-auto p-4 space-y-4">
+          {historyBefore && (
+            <div className="flex justify-center">
+              <Button variant="outline" size="sm" onClick={loadEarlierMessages}>
+                Load earlier messages
+              </Button>
+            </div>
+          )}
           {history.map((msg) => (
             <HistoryMessageBubble key={msg.id} message={msg} />
           ))}
@@ -185,7 +185,7 @@ export function NavConversations() {
                 <SidebarMenuButton asChild>
                   <Link href="/conversations">
                     <span className="text-muted-foreground">
-                      View all ({conversations.length})
+                      View all
                     </span>
                   </Link>
                 </SidebarMenuButton>
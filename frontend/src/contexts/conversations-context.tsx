@@ -14,6 +14,8 @@ interface ConversationsContextType {
   conversations: Conversation[];
   currentConversationId: string | null;
   loading: boolean;
+  hasMore: boolean;
+  loadMoreConversations: () => Promise<void>;
   setCurrentConversationId: (id: string | null) => void;
   createConversation: (title?: string) => Promise<Conversation | null>;
   updateConversation: (id: string, title: string) => Promise<void>;
@@ -30,13 +32,16 @@ export function ConversationsProvider({ children }: { children: React.ReactNode
   const [conversations, setConversations] = useState<Conversation[]>([]);
   const [currentConversationId, setCurrentConversationId] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
+  // Reloads the first page (most recently updated conversations)
   const refreshConversations = useCallback(async () => {
     try {
       const res = await fetch("/api/conversations");
       if (res.ok) {
         const data = await res.json();
         setConversations(data.conversations || []);
+        setNextCursor(data.next_cursor || null);
       }
     } catch (error) {
       console.error("Failed to fetch conversations:", error);
@@ -45,6 +50,23 @@ export function ConversationsProvider({ children }: { children: React.ReactNode
     }
   }, []);
 
+  const loadMoreConversations = useCallback(async () => {
+    if (!nextCursor) return;
+    try {
+      const res = await fetch(`/api/conversations?cursor=${encodeURIComponent(nextCursor)}`);
+      if (res.ok) {
+        const data = await res.json();
+        setConversations(prev => {
+          const seen = new Set(prev.map(c => c.id));
+          return [...prev, ...(data.conversations || []).filter((c: Conversation) => !seen.has(c.id))];
+        });
+        setNextCursor(data.next_cursor || null);
+      }
+    } catch (error) {
+      console.error("Failed to load more conversations:", error);
+    }
+  }, [nextCursor]);
+
   const createConversation = useCallback(async (title?: string): Promise<Conversation | null> => {
     try {
       const res = await fetch("/api/conversations", {
@@ -169,6 +191,8 @@ export function ConversationsProvider({ children }: { children: React.ReactNode
         conversations,
         currentConversationId,
         loading,
+        hasMore: nextCursor !== null,
+        loadMoreConversations,
         setCurrentConversationId,
         createConversation,
         updateConversation,